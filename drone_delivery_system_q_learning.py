@@ -17,10 +17,25 @@ import sys
 import os
 import random
 import pickle
+import threading
+import queue
+import time
+import cProfile
+import multiprocessing as mp
+import csv
+import json
+import re
+import socket
+import socketserver
+import struct
+import zlib
+from collections import OrderedDict
 import numpy as np
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QDoubleSpinBox, QGroupBox, QGridLayout, QFileDialog, QMessageBox, QComboBox, QSlider)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
-from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QFont, QIcon, QPixmap
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QDoubleSpinBox, QGroupBox, QGridLayout, QFileDialog, QMessageBox, QComboBox, QSlider, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QRect
+from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QFont, QIcon, QPixmap, QImage
+
+MAX_DELIVERIES = 3 # Bir episode'daki en fazla teslimat noktası sayısı.
 
 # =====================
 # Ortam (Environment) Sınıfı
@@ -32,12 +47,14 @@ class DroneDeliveryEnv:
     - Kırmızı: Teslimat noktaları
     - Mavi: Drone
     - Batarya, kargo, teslimatlar, uçuş durumu
+    - scenario_source verilirse episode'lar rastgele değil, kayıtlı siparişlerden (ScenarioStream) kurulur
     """
-    def __init__(self, grid_size=5, max_steps=100, n_deliveries=1):
+    def __init__(self, grid_size=5, max_steps=100, n_deliveries=1, scenario_source=None):
         # Ortamın temel parametreleri: grid boyutu, maksimum adım sayısı, teslimat noktası sayısı
         self.grid_size = grid_size
         self.max_steps = max_steps
         self.n_deliveries = n_deliveries
+        self.scenario_source = scenario_source # Opsiyonel senaryo kaynağı (next_scenario() metodu olan nesne).
         # Eylem uzayı: 
         # 0: Aşağı, 1: Sağa, 2: Yukarı, 3: Sola, 4: Kargo Al/Bırak, 5: Kalk/İn
         self.action_space_n = 6  # Drone'un yapabileceği toplam eylem sayısı
@@ -58,24 +75,27 @@ class DroneDeliveryEnv:
 
     def reset(self):
         # Ortamı başlangıç durumuna sıfırlar. Her yeni bölüm (episode) başında çağrılır.
-        # Drone'u grid üzerinde rastgele bir konumda başlat (Taxi-v3 mantığı)
-        self.drone_pos = np.array([
-            random.randint(0, self.grid_size-1),
-            random.randint(0, self.grid_size-1)
-        ])
-        # Kargo deposunun konumu sabit.
-        self.cargo_depot_pos = np.array([self.grid_size-1, self.grid_size-1])
-        # Teslimat noktası sayısını her episode'da 1-3 arası rastgele seç
-        self.n_deliveries = random.randint(1, 3)
-        # Kargo deposu köşesini hariç tutarak teslimat noktası seç (Taxi-v3 mantığı)
-        # Teslimat noktaları, kargo deposu olmayan köşelerden rastgele seçilir.
-        available_indices = [i for i in range(len(self.fixed_delivery_points)) if not np.array_equal(self.fixed_delivery_points[i], self.cargo_depot_pos)]
-        chosen_indices = random.sample(available_indices, self.n_deliveries)
-        self.delivery_points = [self.fixed_delivery_points[i].copy() for i in chosen_indices]
-        self.delivery_indices = chosen_indices  # State için indexler
-        # Drone'un başlangıç durumu: kargo yok, batarya dolu, adım sayısı sıfır, teslimatlar yapılmamış.
+        if self.scenario_source is not None:
+            self.apply_scenario(self.scenario_source.next_scenario())
+        else:
+            # Drone'u grid üzerinde rastgele bir konumda başlat (Taxi-v3 mantığı)
+            self.drone_pos = np.array([
+                random.randint(0, self.grid_size-1),
+                random.randint(0, self.grid_size-1)
+            ])
+            # Kargo deposunun konumu sabit.
+            self.cargo_depot_pos = np.array([self.grid_size-1, self.grid_size-1])
+            # Teslimat noktası sayısını her episode'da 1-3 arası rastgele seç
+            self.n_deliveries = random.randint(1, 3)
+            # Kargo deposu köşesini hariç tutarak teslimat noktası seç (Taxi-v3 mantığı)
+            # Teslimat noktaları, kargo deposu olmayan köşelerden rastgele seçilir.
+            available_indices = [i for i in range(len(self.fixed_delivery_points)) if not np.array_equal(self.fixed_delivery_points[i], self.cargo_depot_pos)]
+            chosen_indices = random.sample(available_indices, self.n_deliveries)
+            self.delivery_points = [self.fixed_delivery_points[i].copy() for i in chosen_indices]
+            self.delivery_indices = chosen_indices  # State için indexler
+            self.battery = 100
+        # Drone'un başlangıç durumu: kargo yok, adım sayısı sıfır, teslimatlar yapılmamış.
         self.has_cargo = False
-        self.battery = 100
         self.steps = 0
         self.delivered = [False]*len(self.delivery_points)
         self.done = False # Bölümün bitip bitmediğini gösterir.
@@ -86,6 +106,26 @@ class DroneDeliveryEnv:
         self.total_reward = 0  # Toplam ödül (her episode başında sıfırlanır)
         return self.get_state() # Ortamın mevcut durumunu döndürür.
 
+    def apply_scenario(self, scenario):
+        # Kayıtlı bir senaryoyu (depo, teslimat noktaları, başlangıç konumu, batarya) ortama uygular.
+        points = [scenario["depot"], scenario["start"]] + list(scenario["delivery_points"])
+        for x, y in points:
+            if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+                raise ValueError(f"Senaryo konumu ({x}, {y}) {self.grid_size}x{self.grid_size} grid dışında.")
+        if not 1 <= len(scenario["delivery_points"]) <= MAX_DELIVERIES:
+            raise ValueError(f"Senaryo 1-{MAX_DELIVERIES} teslimat noktası içermeli.")
+        self.drone_pos = np.array(scenario["start"])
+        self.cargo_depot_pos = np.array(scenario["depot"])
+        self.delivery_points = [np.array(point) for point in scenario["delivery_points"]]
+        self.n_deliveries = len(self.delivery_points)
+        # State indeksleri: sabit köşelerdeki noktalar köşe indeksini korur (eğitilmiş tablolarla uyumlu),
+        # diğer noktalar hücre numarasıyla (köşe indekslerinden sonra) kodlanır.
+        self.delivery_indices = []
+        for point in self.delivery_points:
+            corner = next((i for i, fixed in enumerate(self.fixed_delivery_points) if np.array_equal(fixed, point)), None)
+            self.delivery_indices.append(corner if corner is not None else len(self.fixed_delivery_points) + int(point[0]) * self.grid_size + int(point[1]))
+        self.battery = int(scenario["battery"])
+
     def get_state(self):
         # Ortamın mevcut durumunu temsil eden bir tuple döndürür.
         # Bu durum, Q-tablosunda anahtar olarak kullanılır.
@@ -265,13 +305,348 @@ class DroneDeliveryEnv:
         self.last_action_info = info.get("action", "-")
         return self.get_state(), reward, self.done, info # Yeni durum, ödül, bölüm durumu ve ek bilgiyi döndür.
 # =====================
+# Durum Soyutlama (State Abstraction)
+# =====================
+TRANSPOSED_ACTIONS = (1, 0, 3, 2, 4, 5) # x<->y yansımasında eylem karşılıkları (Aşağı<->Sağa, Yukarı<->Sola).
+
+class StateAbstraction:
+    """
+    Ortam durumunu ajanın gördüğü daha küçük bir duruma indirger:
+    - battery_buckets: batarya kova sayısı (11 = orijinal get_state)
+    - relative_target: mutlak (x, y) yerine mevcut hedefe (depo / en yakın teslimat) göreli ofset
+    - symmetry: depo köşegen üzerindeyse x<->y yansımasıyla yerleşimleri kanonik hale getirir
+      (çerçeve her adımda mevcut duruma göre seçilir ve eylemler de yansıtılır; bu yüzden
+      soyutlama AbstractedEnv üzerinden kullanılmalıdır)
+    - drop_delivery_indices: teslimat noktası indekslerini durumdan çıkarır
+    Varsayılan parametrelerle env.get_state() ile aynı durumu üretir.
+    """
+    def __init__(self, battery_buckets=11, relative_target=False, symmetry=False, drop_delivery_indices=False):
+        self.battery_buckets = battery_buckets
+        self.relative_target = relative_target
+        self.symmetry = symmetry
+        self.drop_delivery_indices = drop_delivery_indices
+
+    def _coords(self, env):
+        # Durumdaki konum alanları: mutlak (x, y) veya hedefe göreli ofset.
+        x, y = int(env.drone_pos[0]), int(env.drone_pos[1])
+        if self.relative_target:
+            target = self.current_target(env)
+            return (int(target[0]) - x, int(target[1]) - y) if target is not None else (0, 0)
+        return x, y
+
+    def is_flipped(self, env, coords=None):
+        # Mevcut durum yansıtılmış (x<->y) çerçevede mi ele alınacak? Yerleşim yansımasıyla
+        # sözlük sırasında küçülüyorsa yansıtılır; yerleşim kendi yansımasıysa konum x <= y olacak şekilde seçilir.
+        if not self.symmetry or env.cargo_depot_pos[0] != env.cargo_depot_pos[1]:
+            return False
+        indices = tuple(env.delivery_indices)
+        transposed = tuple(self._transpose_index(env, idx) for idx in indices)
+        if transposed != indices:
+            return transposed < indices
+        x, y = coords if coords is not None else self._coords(env)
+        return x > y
+
+    @staticmethod
+    def _transpose_index(env, idx):
+        # Köşe indeksi (0-3) veya hücre kodlu indeksin yansıması.
+        corners = len(env.fixed_delivery_points)
+        if idx < corners:
+            x, y = env.fixed_delivery_points[idx]
+            return next(i for i, point in enumerate(env.fixed_delivery_points) if point[0] == y and point[1] == x)
+        cell = idx - corners
+        x, y = divmod(cell, env.grid_size)
+        return corners + y * env.grid_size + x
+
+    @staticmethod
+    def current_target(env):
+        # step()'teki ödül şekillendirmesiyle aynı hedef: kargo yoksa depo, varsa en yakın teslim edilmemiş nokta.
+        if not env.has_cargo and not all(env.delivered):
+            return env.cargo_depot_pos
+        if env.has_cargo:
+            best, best_dist = None, float('inf')
+            for i, point in enumerate(env.delivery_points):
+                if not env.delivered[i]:
+                    dist = np.sum(np.abs(env.drone_pos - point))
+                    if dist < best_dist:
+                        best, best_dist = point, dist
+            return best
+        return None
+
+    def abstract(self, env):
+        # Ortamın mevcut durumunun soyut karşılığını döndürür.
+        x, y = self._coords(env)
+        flipped = self.is_flipped(env, (x, y))
+        if flipped:
+            x, y = y, x
+        state = (x, y, int(env.has_cargo), int(env.is_flying))
+        state += tuple(int(d) for d in env.delivered)
+        state += (min(int(env.battery) * self.battery_buckets // 110, self.battery_buckets - 1),)
+        if not self.drop_delivery_indices:
+            if flipped:
+                state += tuple(self._transpose_index(env, idx) for idx in env.delivery_indices)
+            else:
+                state += tuple(env.delivery_indices)
+        return state
+
+    def env_action(self, env, action):
+        # Ajanın (kanonik çerçevedeki) eylemini ortamın eylemine çevirir.
+        return TRANSPOSED_ACTIONS[action] if self.is_flipped(env) else action
+
+class AbstractedEnv:
+    """
+    DroneDeliveryEnv'i bir StateAbstraction ile saran ortam: reset/step soyut durum döndürür,
+    eylemleri gerekirse yansıtarak ortama iletir. Diğer tüm öznitelikler (grid_size, delivered, steps...)
+    alttaki ortama yönlendirilir; böylece QLearningAgent ve eğitim yardımcıları değişmeden kullanılır.
+    """
+    def __init__(self, env, abstraction):
+        self.env = env
+        self.abstraction = abstraction
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def get_state(self):
+        return self.abstraction.abstract(self.env)
+
+    def reset(self):
+        self.env.reset()
+        return self.get_state()
+
+    def step(self, action):
+        _, reward, done, info = self.env.step(self.abstraction.env_action(self.env, action))
+        return self.get_state(), reward, done, info
+
+def compare_abstractions(abstractions, grid_size=5, episodes=2000, eval_episodes=200, seed=0):
+    # Her soyutlama için aynı tohumla eğitim yapıp tablo boyutu, eğitim hızı ve politika kalitesini raporlar.
+    results = []
+    for name, abstraction in abstractions.items():
+        random.seed(seed); np.random.seed(seed)
+        env = AbstractedEnv(DroneDeliveryEnv(grid_size=grid_size), abstraction)
+        agent = QLearningAgent(env)
+        start = time.perf_counter()
+        env_steps = train_episodes(env, agent, episodes)
+        elapsed = time.perf_counter() - start
+        evaluation = evaluate_greedy_policy(env, agent, eval_episodes)
+        results.append({
+            "name": name,
+            "n_states": len(agent.q_table),
+            "memory_bytes": agent.memory_usage()["total_bytes"],
+            "train_seconds": elapsed,
+            "steps_per_second": env_steps / elapsed if elapsed else 0.0,
+            "success_rate": evaluation["success_rate"],
+            "avg_reward": evaluation["avg_reward"],
+        })
+    return results
+
+# =====================
+# Kayıtlı Sipariş Senaryoları (Akış)
+# =====================
+# İkili senaryo kaydının sabit boyutlu kayıt tipi (np.memmap ile parça parça okunur).
+SCENARIO_DTYPE = np.dtype([
+    ("depot", np.int16, (2,)),
+    ("start", np.int16, (2,)),
+    ("battery", np.int16),
+    ("n_deliveries", np.int8),
+    ("delivery_points", np.int16, (MAX_DELIVERIES, 2)),
+])
+SCENARIO_CSV_FIELDS = ["depot_x", "depot_y", "start_x", "start_y", "battery", "delivery_points"] # delivery_points: "x:y|x:y"
+
+def _scenarios_from_records(records):
+    # Kayıt dizisini alan alan (vektörel) Python nesnelerine çevirir.
+    fields = zip(records["depot"].tolist(), records["start"].tolist(), records["battery"].tolist(),
+                 records["n_deliveries"].tolist(), records["delivery_points"].tolist())
+    return [{
+        "depot": tuple(depot),
+        "start": tuple(start),
+        "battery": battery,
+        "delivery_points": [tuple(point) for point in points[:n]],
+    } for depot, start, battery, n, points in fields]
+
+def _scenario_to_record(scenario, record):
+    points = list(scenario["delivery_points"])
+    if not 1 <= len(points) <= MAX_DELIVERIES:
+        raise ValueError(f"Senaryo 1-{MAX_DELIVERIES} teslimat noktası içermeli.")
+    record["depot"] = scenario["depot"]
+    record["start"] = scenario["start"]
+    record["battery"] = scenario["battery"]
+    record["n_deliveries"] = len(points)
+    record["delivery_points"][:len(points)] = points
+
+def _scenario_from_csv_row(row):
+    points = [tuple(int(v) for v in point.split(":")) for point in row["delivery_points"].split("|") if point]
+    return {
+        "depot": (int(row["depot_x"]), int(row["depot_y"])),
+        "start": (int(row["start_x"]), int(row["start_y"])),
+        "battery": int(row["battery"]),
+        "delivery_points": points,
+    }
+
+def _scenario_to_csv_row(scenario):
+    points = list(scenario["delivery_points"])
+    if not 1 <= len(points) <= MAX_DELIVERIES:
+        raise ValueError(f"Senaryo 1-{MAX_DELIVERIES} teslimat noktası içermeli.")
+    return {
+        "depot_x": scenario["depot"][0], "depot_y": scenario["depot"][1],
+        "start_x": scenario["start"][0], "start_y": scenario["start"][1],
+        "battery": scenario["battery"],
+        "delivery_points": "|".join(f"{x}:{y}" for x, y in points),
+    }
+
+def write_scenario_log(path, scenarios, chunk_size=65536):
+    # Senaryoları (generator olabilir) kayıt dosyasına parça parça yazar; yazılan kayıt sayısını döndürür.
+    # Uzantı .csv ise CSV, değilse ikili kayıt yazılır (iter_scenario_log ile simetrik).
+    if path.lower().endswith(".csv"):
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SCENARIO_CSV_FIELDS)
+            writer.writeheader()
+            for scenario in scenarios:
+                writer.writerow(_scenario_to_csv_row(scenario))
+                count += 1
+        return count
+    count = 0
+    chunk = np.zeros(chunk_size, dtype=SCENARIO_DTYPE)
+    filled = 0
+    with open(path, 'wb') as f:
+        for scenario in scenarios:
+            _scenario_to_record(scenario, chunk[filled])
+            filled += 1
+            if filled == chunk_size:
+                f.write(chunk.tobytes()); count += filled
+                chunk[:] = 0; filled = 0
+        if filled:
+            f.write(chunk[:filled].tobytes()); count += filled
+    return count
+
+def iter_scenario_log(path, chunk_size=4096):
+    # Senaryo kaydını (ikili .bin veya .csv) parça parça okuyan generator; her parça bir senaryo listesidir.
+    # Dosyanın tamamı belleğe alınmaz: ikili kayıtlar np.memmap, CSV satır satır okunur.
+    if path.lower().endswith(".csv"):
+        with open(path, newline='', encoding='utf-8') as f:
+            chunk = []
+            for row in csv.DictReader(f):
+                chunk.append(_scenario_from_csv_row(row))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        return
+    if os.path.getsize(path) == 0:
+        return
+    records = np.memmap(path, dtype=SCENARIO_DTYPE, mode='r')
+    for start in range(0, len(records), chunk_size):
+        yield _scenarios_from_records(np.array(records[start:start + chunk_size]))
+    del records
+
+class ScenarioStream:
+    """
+    Kayıtlı sipariş geçmişinden episode senaryosu akışı:
+    - Kayıt dosyası (.bin/.csv) arka plan thread'inde parça parça okunur ve sınırlı bir kuyrukta önceden hazırlanır
+    - DroneDeliveryEnv.reset() her çağrıda next_scenario() ile bir sonraki senaryoyu alır
+    - loop=True ise dosya sonunda başa dönülür; aksi halde akış bitince StopIteration fırlatılır
+    """
+    def __init__(self, path, chunk_size=4096, prefetch_chunks=4, loop=True):
+        self.path = path # Senaryo kayıt dosyası.
+        self.chunk_size = chunk_size # Bir parçadaki senaryo sayısı.
+        self.loop = loop # Dosya bitince başa dönülsün mü?
+        self._queue = queue.Queue(maxsize=prefetch_chunks) # Önceden okunmuş parçalar (bellek sınırlı).
+        self._stop = threading.Event()
+        self._current = [] # Tüketilmekte olan parça.
+        self._position = 0
+        self._finished = False
+        self.consumed = 0 # Tüketilen toplam senaryo sayısı.
+        self.error = None # Okuyucu thread'inde oluşan hata.
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _put(self, item):
+        # Kuyruk doluysa durdurma isteğini kontrol ederek bekler.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_loop(self):
+        try:
+            while not self._stop.is_set():
+                produced = False
+                for chunk in iter_scenario_log(self.path, self.chunk_size):
+                    produced = True
+                    if not self._put(chunk):
+                        return
+                if not self.loop or not produced:
+                    break
+        except Exception as e:  # Okuma hatası tüketiciye iletilir
+            self.error = e
+        self._put(None) # Akış sonu işareti.
+
+    def next_scenario(self):
+        # Bir sonraki senaryoyu döndürür; önceden okunmuş parça varsa I/O beklemez.
+        if self._position >= len(self._current):
+            if self._finished:
+                raise StopIteration("Senaryo akışı bitti.")
+            chunk = self._queue.get()
+            if chunk is None:
+                self._finished = True
+                if self.error is not None:
+                    raise self.error
+                raise StopIteration("Senaryo akışı bitti.")
+            self._current, self._position = chunk, 0
+        scenario = self._current[self._position]
+        self._position += 1
+        self.consumed += 1
+        return scenario
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.next_scenario()
+            except StopIteration:
+                return
+
+    def close(self):
+        # Okuyucu thread'ini durdurur.
+        self._stop.set()
+        self._reader.join(timeout=1)
+
+# =====================
 # Q-Learning Ajanı
 # =====================
+def q_table_memory_usage(q_table):
+    # Bir Q-tablosunun yaklaşık bellek kullanımını (byte) döndürür.
+    n_states = len(q_table)
+    dict_bytes = sys.getsizeof(q_table)
+    key_bytes = 0
+    row_bytes = 0
+    zero_rows = 0
+    for state, row in q_table.items():
+        key_bytes += sys.getsizeof(state)
+        if isinstance(state, tuple): # Eski modellerde anahtarlar hashlenmiş int olabilir.
+            key_bytes += sum(sys.getsizeof(field) for field in state)
+        row_bytes += sys.getsizeof(row) + (0 if row.flags.owndata else row.nbytes) # ndarray başlığı + veri
+        zero_rows += int(not row.any())
+    total = dict_bytes + key_bytes + row_bytes
+    return {
+        "n_states": n_states,
+        "zero_rows": zero_rows,
+        "dict_bytes": dict_bytes,
+        "key_bytes": key_bytes,
+        "row_bytes": row_bytes,
+        "total_bytes": total,
+        "bytes_per_state": total / n_states if n_states else 0.0,
+    }
+
 class QLearningAgent:
     """
     Q-Learning ajanı: Epsilon-greedy, Q-Table, deneyim havuzu
+    - planning_steps > 0 ise Dyna-Q: gerçek adımlardan öğrenilen tablo modeliyle ek planlama güncellemeleri
+    - dtype: Q-satırlarının veri tipi (float64 varsayılan; float32 belleği yarıya indirir)
     """
-    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.01):
+    def __init__(self, env, alpha=0.1, gamma=0.99, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.01, planning_steps=0, dtype=np.float64):
         # Q-Learning parametreleri ve Q-Table başlatma
         self.env = env # Ajanın etkileşimde bulunacağı ortam.
         self.alpha = alpha  # Öğrenme oranı (learning rate): Yeni bilginin ne kadar dikkate alınacağını belirler.
@@ -280,18 +655,45 @@ class QLearningAgent:
         self.epsilon_decay = epsilon_decay  # Epsilon azalma oranı: Epsilon'un her bölüm sonunda ne kadar azalacağını belirler.
         self.min_epsilon = min_epsilon  # Minimum keşif oranı: Epsilon'un düşebileceği en düşük değer.
         self.q_table = {}  # Q-Tablosu (durum-aksiyon değerleri): Her durum-eylem çifti için beklenen ödülü saklar.
+        self.dtype = np.dtype(dtype) # Q-değerlerinin veri tipi.
         self.experience_buffer = []  # Deneyim havuzu (replay buffer): Ajanın geçmiş deneyimlerini saklar.
         self.buffer_size = 1000 # Deneyim havuzunun maksimum boyutu.
         self.batch_size = 32 # Deneyim tekrarı sırasında kullanılacak örneklem boyutu.
         self.learn_interval = 4 # Kaç adımda bir deneyim tekrarı yapılacağı.
         self.step_counter = 0 # Adım sayacı.
+        # Dyna-Q: (durum, eylem) -> [ödül toplamı, gözlem sayısı, (sonraki durum, bitti mi) örnekleri] modeli.
+        # Ajanın gördüğü durum deterministik değildir (batarya 10'luk kovalarda, adım sayısı ve
+        # max_steps sonlanması durumda yok, son ödül tam bataryaya bağlı); bu yüzden ortalama ödül
+        # ve sınırlı bir sonuç örneklemi tutulur, planlamada bu örneklemden çekilir.
+        self.planning_steps = planning_steps # Her gerçek adım başına yapılacak planlama güncellemesi sayısı (0: kapalı).
+        self.env_model = {} # Öğrenilen ortam modeli.
+        self.env_model_keys = [] # Modelden O(1) rastgele örnekleme için anahtar listesi.
+        self.model_samples = 16 # Anahtar başına saklanan en fazla sonuç örneği (rezervuar örnekleme).
+        self.planning_updates = 0 # Toplam planlama güncellemesi sayısı (enstrümantasyon).
+        self.dirty_states = set() # Son checkpoint'ten beri Q-değeri değişen durumlar (artımlı checkpoint için).
+        # Yakınsama takibi: son pencere boyunca |ΔQ| sayısı, toplamı ve maksimumu.
+        self.delta_count = 0
+        self.delta_sum = 0.0
+        self.delta_max = 0.0
+        self.frozen = False # Salt okunur (inference) modu: bilinmeyen durumlar tabloya eklenmez, öğrenme yapılmaz.
+
+    def get_q_row(self, state):
+        # Durumun Q-satırını döndürür. Durum tabloda yoksa sıfır satırı eklenir;
+        # donmuş (frozen) modda ise tabloya eklemeden salt okunur bir sıfır satırı döner.
+        row = self.q_table.get(state)
+        if row is None:
+            row = np.zeros(self.env.action_space_n, dtype=self.dtype)
+            if self.frozen:
+                row.flags.writeable = False
+            else:
+                self.q_table[state] = row
+                self.dirty_states.add(state) # Yeni satır da checkpoint'e girmeli.
+        return row
 
     def get_q_value(self, state, action):
         # Belirli bir durum ve aksiyon için Q-değerini döndür
         # Eğer durum Q-tablosunda yoksa, o durum için tüm eylemlerin Q-değerlerini sıfır olarak başlatır.
-        if state not in self.q_table:
-            self.q_table[state] = np.zeros(self.env.action_space_n)
-        return self.q_table[state][action]
+        return self.get_q_row(state)[action]
 
     def select_action(self, state, training=True):
         # Epsilon-greedy aksiyon seçimi
@@ -300,21 +702,23 @@ class QLearningAgent:
         if training and np.random.rand() < self.epsilon:
             return np.random.randint(self.env.action_space_n)  # Rastgele aksiyon (keşif)
         else:
-            if state not in self.q_table: # Eğer durum Q-tablosunda yoksa, başlat.
-                self.q_table[state] = np.zeros(self.env.action_space_n)
-            max_value = np.max(self.q_table[state]) # En yüksek Q-değerini bul.
+            q_values = self.get_q_row(state) # Durum yoksa başlatılır (donmuş modda eklenmez).
+            max_value = np.max(q_values) # En yüksek Q-değerini bul.
             # En yüksek Q-değerine sahip birden fazla eylem varsa, aralarından rastgele birini seç.
-            max_indices = np.where(self.q_table[state] == max_value)[0]
+            max_indices = np.where(q_values == max_value)[0]
             return np.random.choice(max_indices)  # En iyi aksiyon (sömürü)
 
     def learn(self, state, action, reward, next_state, done):
         # Q-Table güncellemesi ve deneyim havuzuna ekleme
         # Bu fonksiyon, ajanın bir eylem gerçekleştirdikten sonra Q-tablosunu güncellemesini sağlar.
+        if self.frozen:
+            raise RuntimeError("Q-tablosu donmuş (frozen) modda; öğrenmek için önce unfreeze() çağırın.")
         self.add_experience(state, action, reward, next_state, done) # Deneyimi havuza ekle.
         if state not in self.q_table: # Durum Q-tablosunda yoksa başlat.
-            self.q_table[state] = np.zeros(self.env.action_space_n)
+            self.q_table[state] = np.zeros(self.env.action_space_n, dtype=self.dtype)
         if next_state not in self.q_table: # Sonraki durum Q-tablosunda yoksa başlat.
-            self.q_table[next_state] = np.zeros(self.env.action_space_n)
+            self.q_table[next_state] = np.zeros(self.env.action_space_n, dtype=self.dtype)
+            self.dirty_states.add(next_state) # Yeni satır da checkpoint'e girmeli.
         
         current_q = self.q_table[state][action] # Mevcut Q-değeri.
         # Eğer bölüm bittiyse (done=True), gelecekteki maksimum Q-değeri 0 olur.
@@ -323,8 +727,14 @@ class QLearningAgent:
         # Q-değeri güncelleme formülü (Bellman denklemi).
         new_q = current_q + self.alpha * (reward + self.gamma * max_future_q - current_q)
         self.q_table[state][action] = new_q # Q-tablosunu güncelle.
+        self._record_delta(abs(new_q - current_q))
+        self.dirty_states.add(state)
         
         self.step_counter += 1
+        # Dyna-Q: modeli gerçek geçişle güncelle ve planlama yap.
+        if self.planning_steps > 0:
+            self.update_model(state, action, reward, next_state, done)
+            self.planning()
         # Deneyim tekrarını belirli aralıklarla uygula
         # Deneyim havuzu yeterince doluysa ve belirli bir adım aralığına ulaşıldıysa deneyim tekrarı yapılır.
         if self.step_counter % self.learn_interval == 0 and len(self.experience_buffer) >= self.batch_size:
@@ -343,31 +753,1806 @@ class QLearningAgent:
         batch = random.sample(self.experience_buffer, self.batch_size) # Havuzdan rastgele bir batch seç.
         for state, action, reward, next_state, done in batch: # Seçilen her deneyim için Q-değerini güncelle.
             if state not in self.q_table:
-                self.q_table[state] = np.zeros(self.env.action_space_n)
+                self.q_table[state] = np.zeros(self.env.action_space_n, dtype=self.dtype)
             if next_state not in self.q_table:
-                self.q_table[next_state] = np.zeros(self.env.action_space_n)
+                self.q_table[next_state] = np.zeros(self.env.action_space_n, dtype=self.dtype)
             current_q = self.q_table[state][action]
             max_future_q = 0 if done else np.max(self.q_table[next_state])
             replay_alpha = self.alpha * 0.7 # Deneyim tekrarı için biraz daha düşük bir öğrenme oranı kullanılabilir.
             new_q = current_q + replay_alpha * (reward + self.gamma * max_future_q - current_q)
             self.q_table[state][action] = new_q
+            self._record_delta(abs(new_q - current_q))
+            self.dirty_states.add(state)
+
+    def update_model(self, state, action, reward, next_state, done):
+        # Gerçek bir geçişi ortam modeline yazar (Dyna-Q).
+        key = (state, action)
+        entry = self.env_model.get(key)
+        if entry is None:
+            self.env_model_keys.append(key)
+            entry = self.env_model[key] = [0.0, 0, []]
+        entry[0] += reward
+        entry[1] += 1
+        outcomes = entry[2]
+        if len(outcomes) < self.model_samples:
+            outcomes.append((next_state, done))
+        else: # Rezervuar örnekleme: her gözlem eşit olasılıkla örneklemde kalır.
+            slot = np.random.randint(entry[1])
+            if slot < self.model_samples:
+                outcomes[slot] = (next_state, done)
+
+    def planning(self, n_updates=None):
+        # Modelden rastgele örneklenen geçişlerle toplu (NumPy) Q güncellemesi yapar.
+        # Ödül olarak anahtarın ortalama ödülü, sonraki durum olarak sonuç örnekleminden rastgele biri kullanılır.
+        # Aynı batch içindeki tekrar eden (durum, eylem) çiftlerinde son yazılan değer geçerli olur.
+        n_updates = self.planning_steps if n_updates is None else n_updates
+        if n_updates <= 0 or not self.env_model_keys:
+            return 0
+        indices = np.random.randint(len(self.env_model_keys), size=n_updates)
+        picks = np.random.random(n_updates)
+        keys = [self.env_model_keys[i] for i in indices]
+        entries = [self.env_model[key] for key in keys]
+        outcomes = [entry[2][int(pick * len(entry[2]))] for entry, pick in zip(entries, picks)]
+        for next_state, _ in outcomes: # Modeldeki durumlar learn() sırasında tabloya eklenmiştir; yine de garanti et.
+            if next_state not in self.q_table:
+                self.q_table[next_state] = np.zeros(self.env.action_space_n, dtype=self.dtype)
+        rewards = np.array([entry[0] / entry[1] for entry in entries], dtype=float)
+        dones = np.array([done for _, done in outcomes], dtype=bool)
+        current_q = np.array([self.q_table[s][a] for s, a in keys])
+        max_future_q = np.stack([self.q_table[next_state] for next_state, _ in outcomes]).max(axis=1)
+        max_future_q[dones] = 0
+        new_q = current_q + self.alpha * (rewards + self.gamma * max_future_q - current_q)
+        for (s, a), value in zip(keys, new_q):
+            self.q_table[s][a] = value
+            self.dirty_states.add(s)
+        self.planning_updates += n_updates
+        deltas = np.abs(new_q - current_q)
+        self.delta_count += n_updates
+        self.delta_sum += float(deltas.sum())
+        self.delta_max = max(self.delta_max, float(deltas.max()))
+        return n_updates
+
+    def _record_delta(self, delta):
+        # Tek bir Q güncellemesinin mutlak değişimini yakınsama istatistiklerine ekler.
+        self.delta_count += 1
+        self.delta_sum += delta
+        if delta > self.delta_max:
+            self.delta_max = delta
+
+    def pop_delta_stats(self):
+        # Son çağrıdan beri |ΔQ| istatistiklerini döndürür ve sıfırlar.
+        stats = {
+            "updates": self.delta_count,
+            "max_delta": float(self.delta_max),
+            "mean_delta": float(self.delta_sum / self.delta_count) if self.delta_count else 0.0,
+        }
+        self.delta_count = 0
+        self.delta_sum = 0.0
+        self.delta_max = 0.0
+        return stats
+
+    def sample_efficiency_stats(self):
+        # Gerçek adım başına yapılan toplam Q güncellemesi ve model büyüklüğü.
+        real_steps = self.step_counter
+        return {
+            "real_steps": real_steps,
+            "planning_updates": self.planning_updates,
+            "updates_per_real_step": (real_steps + self.planning_updates) / real_steps if real_steps else 0.0,
+            "model_size": len(self.env_model),
+        }
 
     def decay_epsilon(self):
         # Epsilon'u kademeli olarak azalt
         # Bu, ajanın zamanla daha fazla sömürü yapmasını ve daha az keşif yapmasını sağlar.
         self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
 
+    def set_q_table(self, q_table):
+        # Q-tablosunu toptan değiştirir; tüm satırlar bir sonraki checkpoint'e yazılacak şekilde işaretlenir.
+        # Satırlar ajanın veri tipinde değilse dönüştürülür.
+        self.q_table = {state: np.asarray(row, dtype=self.dtype) for state, row in q_table.items()}
+        self.dirty_states = set(self.q_table)
+
+    def set_dtype(self, dtype):
+        # Tüm Q-satırlarını verilen veri tipine dönüştürür (ör: inference için float16).
+        self.dtype = np.dtype(dtype)
+        for state, row in self.q_table.items():
+            if row.dtype != self.dtype:
+                self.q_table[state] = row.astype(self.dtype)
+
+    def freeze(self, dtype=None):
+        # Tabloyu salt okunur inference moduna alır; bilinmeyen durum sorguları bellek büyütmez.
+        # dtype verilirse tablo daha küçük bir veri tipine (ör: np.float16) dönüştürülür.
+        if dtype is not None:
+            self.set_dtype(dtype)
+        self.frozen = True
+
+    def unfreeze(self):
+        # Eğitim moduna geri döner.
+        self.frozen = False
+
+    def compact(self):
+        # Hiç güncellenmemiş (tamamen sıfır) satırları siler ve silinen satır sayısını döndürür.
+        # Eksik durumlar zaten sıfır satırı olarak ele alındığı için politika değişmez.
+        empty_states = [state for state, row in self.q_table.items() if not row.any()]
+        for state in empty_states:
+            del self.q_table[state]
+        self.dirty_states.difference_update(empty_states)
+        return len(empty_states)
+
+    def memory_usage(self):
+        # Q-tablosunun yaklaşık bellek kullanımını (byte) döndürür.
+        return q_table_memory_usage(self.q_table)
+
+    def pop_dirty_rows(self):
+        # Son çağrıdan beri değişen Q satırlarının kopyalarını döndürür ve kirli kümesini temizler.
+        rows = {state: self.q_table[state].copy() for state in self.dirty_states}
+        self.dirty_states = set()
+        return rows
+
+    def get_training_state(self):
+        # Q-tablosu dışındaki tüm eğitim durumunu (devam ettirme için) döndürür.
+        return {
+            "grid_size": self.env.grid_size,
+            "dtype": self.dtype.str,
+            "alpha": self.alpha,
+            "gamma": self.gamma,
+            "epsilon": self.epsilon,
+            "epsilon_decay": self.epsilon_decay,
+            "min_epsilon": self.min_epsilon,
+            "experience_buffer": list(self.experience_buffer),
+            "step_counter": self.step_counter,
+            "planning_steps": self.planning_steps,
+            "env_model": {key: (entry[0], entry[1], list(entry[2])) for key, entry in self.env_model.items()}, # Yazıcı thread'i için kopya.
+            "planning_updates": self.planning_updates,
+            "python_rng": random.getstate(),
+            "numpy_rng": np.random.get_state(),
+        }
+
+    def restore_training_state(self, training_state):
+        # get_training_state() çıktısını ajana ve global RNG'lere geri yükler.
+        self.dtype = np.dtype(training_state.get("dtype", self.dtype))
+        self.alpha = training_state["alpha"]
+        self.gamma = training_state["gamma"]
+        self.epsilon = training_state["epsilon"]
+        self.epsilon_decay = training_state["epsilon_decay"]
+        self.min_epsilon = training_state["min_epsilon"]
+        self.experience_buffer = list(training_state["experience_buffer"])
+        self.step_counter = training_state["step_counter"]
+        self.planning_steps = training_state["planning_steps"]
+        self.env_model = {}
+        for key, entry in training_state["env_model"].items():
+            if isinstance(entry[2], list):
+                self.env_model[key] = [entry[0], entry[1], list(entry[2])]
+            else: # Eski checkpoint: (ödül, sonraki durum, bitti mi) son gözlem.
+                self.env_model[key] = [float(entry[0]), 1, [(entry[1], entry[2])]]
+        self.env_model_keys = list(self.env_model.keys())
+        self.planning_updates = training_state["planning_updates"]
+        random.setstate(training_state["python_rng"])
+        np.random.set_state(training_state["numpy_rng"])
+
     def save_q_table(self, filename):
         # Q-Tablosunu dosyaya kaydet
         # Eğitimli modelin daha sonra kullanılabilmesi için Q-tablosu kaydedilir.
         with open(filename, 'wb') as f:
             pickle.dump(self.q_table, f)
 
-    def load_q_table(self, filename):
+    def load_q_table(self, filename, dtype=None):
         # Q-Tablosunu dosyadan yükle
         # Daha önce eğitilmiş bir modelin Q-tablosu yüklenir.
+        # dtype verilirse ajanın veri tipi değiştirilir; satırlar ajanın veri tipine dönüştürülür.
+        if dtype is not None:
+            self.dtype = np.dtype(dtype)
         with open(filename, 'rb') as f:
-            self.q_table = pickle.load(f)
+            self.set_q_table(pickle.load(f))
+
+# =====================
+# Artımlı Checkpoint
+# =====================
+def _atomic_pickle(obj, path):
+    # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yazıp yerine taşır.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+class CheckpointManager:
+    """
+    Arka planda çalışan artımlı checkpoint yazıcısı:
+    - Her checkpoint'te sadece son checkpoint'ten beri değişen Q satırları (delta) yazılır
+    - Ajanın tüm eğitim durumu (epsilon, deneyim havuzu, adım sayacı, RNG) ayrıca saklanır
+    - Deltalar belirli aralıklarla yine arka planda tam tabloya birleştirilir
+    - Disk I/O ayrı thread'de yapılır, eğitim döngüsü sadece kirli satırları kopyalar
+    - Yeni bir eğitim (fresh=True) önceki çalışmanın dosyalarını siler ve ilk checkpoint'te tam taban tablo yazar
+    """
+    FULL_FILE = "qtable_full.pkl"
+    STATE_FILE = "agent_state.pkl"
+
+    def __init__(self, directory="checkpoints", interval=100, consolidate_every=10, fresh=False):
+        self.directory = directory # Checkpoint dizini.
+        self.interval = interval # Kaç episode'da bir checkpoint alınacağı.
+        self.consolidate_every = consolidate_every # Kaç deltada bir tam tabloya birleştirileceği.
+        os.makedirs(self.directory, exist_ok=True)
+        if fresh: # Eski çalışmanın deltaları yeni tablonun üzerine uygulanmamalı.
+            self._clear()
+        self.needs_base = fresh # İlk checkpoint tüm tabloyu taban olarak yazsın mı?
+        self.seq = self._last_seq() # Son yazılan checkpoint sıra numarası.
+        self.error = None # Yazıcı thread'inde oluşan son hata.
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _delta_path(self, seq):
+        return os.path.join(self.directory, f"delta_{seq:06d}.pkl")
+
+    def _delta_seqs(self):
+        # Dizindeki delta dosyalarının sıra numaraları (artan).
+        seqs = []
+        for name in os.listdir(self.directory):
+            if name.startswith("delta_") and name.endswith(".pkl"):
+                seqs.append(int(name[len("delta_"):-len(".pkl")]))
+        return sorted(seqs)
+
+    def _clear(self):
+        # Dizindeki checkpoint dosyalarını (delta, tam tablo, ajan durumu) siler.
+        for seq in self._delta_seqs():
+            os.remove(self._delta_path(seq))
+        for name in (self.FULL_FILE, self.STATE_FILE):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _last_seq(self):
+        state_path = os.path.join(self.directory, self.STATE_FILE)
+        if not os.path.exists(state_path):
+            return 0
+        with open(state_path, 'rb') as f:
+            return pickle.load(f)["seq"]
+
+    def maybe_checkpoint(self, agent, episode):
+        # Episode sayısı aralığa denk geliyorsa checkpoint alır.
+        if self.interval > 0 and episode % self.interval == 0:
+            self.checkpoint(agent, episode)
+
+    def checkpoint(self, agent, episode):
+        # Eğitim thread'inde çağrılır: değişen satırları ve durumu kopyalayıp yazıcıya iletir.
+        self.seq += 1
+        training_state = agent.get_training_state()
+        training_state["episode"] = episode
+        training_state["seq"] = self.seq
+        if self.needs_base: # Taban tablo: sonraki deltalar bunun üzerine uygulanır.
+            agent.pop_dirty_rows()
+            rows = {state: row.copy() for state, row in agent.q_table.items()}
+            self.needs_base = False
+            self._queue.put((self.seq, rows, training_state, True))
+        else:
+            self._queue.put((self.seq, agent.pop_dirty_rows(), training_state, False))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                seq, rows, training_state, is_base = item
+                if is_base:
+                    _atomic_pickle({"seq": seq, "q_table": rows}, os.path.join(self.directory, self.FULL_FILE))
+                else:
+                    _atomic_pickle(rows, self._delta_path(seq))
+                _atomic_pickle(training_state, os.path.join(self.directory, self.STATE_FILE))
+                if self.consolidate_every > 0 and seq % self.consolidate_every == 0:
+                    self._consolidate(seq)
+            except Exception as e:  # Yazma hatası eğitimi durdurmamalı
+                self.error = e
+            finally:
+                self._queue.task_done()
+
+    def _load_table(self, upto_seq):
+        # Tam tabloyu yükler ve üzerine upto_seq'e kadar olan deltaları uygular.
+        q_table, base_seq = {}, 0
+        full_path = os.path.join(self.directory, self.FULL_FILE)
+        if os.path.exists(full_path):
+            with open(full_path, 'rb') as f:
+                full = pickle.load(f)
+            q_table, base_seq = full["q_table"], full["seq"]
+        for seq in self._delta_seqs():
+            if base_seq < seq <= upto_seq:
+                with open(self._delta_path(seq), 'rb') as f:
+                    q_table.update(pickle.load(f))
+        return q_table
+
+    def _consolidate(self, seq):
+        # Deltaları tam tabloya birleştirip eski delta dosyalarını siler.
+        q_table = self._load_table(seq)
+        _atomic_pickle({"seq": seq, "q_table": q_table}, os.path.join(self.directory, self.FULL_FILE))
+        for old_seq in self._delta_seqs():
+            if old_seq <= seq:
+                os.remove(self._delta_path(old_seq))
+
+    def flush(self):
+        # Kuyruktaki tüm checkpoint'ler diske yazılana kadar bekler.
+        self._queue.join()
+
+    def close(self):
+        # Yazıcı thread'ini kuyruğu boşalttıktan sonra kapatır.
+        self._queue.put(None)
+        self._writer.join()
+
+    def has_checkpoint(self):
+        return os.path.exists(os.path.join(self.directory, self.STATE_FILE))
+
+    def read_training_state(self):
+        # Q-tablosunu yüklemeden sadece ajan durumunu okur (ör. grid boyutunu öğrenmek için).
+        with open(os.path.join(self.directory, self.STATE_FILE), 'rb') as f:
+            return pickle.load(f)
+
+    def restore(self, agent):
+        # Ajanı son checkpoint'e geri yükler ve tamamlanan episode sayısını döndürür.
+        self.flush()
+        training_state = self.read_training_state()
+        agent.q_table = self._load_table(training_state["seq"])
+        agent.restore_training_state(training_state)
+        agent.dirty_states = set()
+        self.seq = training_state["seq"]
+        return training_state["episode"]
+
+# =====================
+# Eğitim Profilleme
+# =====================
+class TrainingProfiler:
+    """
+    Eğitim döngüsü için opsiyonel enstrümantasyon:
+    - env.step, get_state, select_action, learn, experience_replay ve sinyal gönderimi için çağrı sayısı/süre
+    - Q-tablosuna eklenen yeni durum, deneyim tekrarı ve sinyal sayaçları
+    - Periyodik rapor ve opsiyonel cProfile (.prof) çıktısı
+    Ölçüm, attach() ile örnek (instance) metotlarının yerine sarmalayıcı koyarak yapılır;
+    profiler verilmediğinde eğitim kodunda hiçbir ek kontrol veya sarmalayıcı çalışmaz.
+    Not: get_state step/reset içinden, experience_replay ise learn içinden çağrıldığı için süreler kapsayıcıdır.
+    """
+    PHASES = ("env.step", "env.get_state", "select_action", "learn", "experience_replay", "signal_emit")
+
+    def __init__(self, report_interval=0, report_callback=print, profile_path=None):
+        self.report_interval = report_interval # Kaç episode'da bir rapor verileceği (0: kapalı).
+        self.report_callback = report_callback # Periyodik raporun iletileceği fonksiyon.
+        self.profile_path = profile_path # cProfile çıktısının yazılacağı dosya (None: kapalı).
+        self.timings = {phase: [0, 0.0] for phase in self.PHASES} # faz -> [çağrı sayısı, toplam süre (s)]
+        self.counters = {"new_states": 0, "replay_calls": 0, "signal_emits": 0, "episodes": 0}
+        self.wall_time = 0.0 # Eğitimin toplam duvar saati süresi.
+        self._patched = [] # Geri alınacak (nesne, öznitelik) çiftleri.
+        self._cprofile = None
+        self._start_time = None
+
+    def _wrap_method(self, obj, name, phase, q_table_owner=None):
+        # Nesnenin metodunu süre ölçen (ve istenirse yeni durum sayan) bir sarmalayıcıyla değiştirir.
+        original = getattr(obj, name)
+        timing = self.timings[phase]
+        counters = self.counters
+        perf_counter = time.perf_counter
+        def wrapper(*args, **kwargs):
+            table_size = len(q_table_owner.q_table) if q_table_owner is not None else 0
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                timing[0] += 1
+                timing[1] += perf_counter() - start
+                if q_table_owner is not None:
+                    counters["new_states"] += len(q_table_owner.q_table) - table_size
+                if phase == "experience_replay":
+                    counters["replay_calls"] += 1
+        setattr(obj, name, wrapper)
+        self._patched.append((obj, name))
+
+    def _wrap_signal(self, thread, name):
+        # QThread sinyalini, emit çağrılarını sayıp ölçen bir vekil nesneyle gölgeler.
+        profiler = self
+        signal = getattr(thread, name)
+        timing = self.timings["signal_emit"]
+        class _SignalProxy:
+            def emit(self, *args):
+                start = time.perf_counter()
+                signal.emit(*args)
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start
+                profiler.counters["signal_emits"] += 1
+            def __getattr__(self, attr): # connect/disconnect gibi çağrılar asıl sinyale gider.
+                return getattr(signal, attr)
+        setattr(thread, name, _SignalProxy())
+        self._patched.append((thread, name))
+
+    def attach(self, thread):
+        # Eğitim thread'inin ortam, ajan ve sinyallerini enstrümante eder.
+        env, agent = thread.env, thread.agent
+        self._wrap_method(env, "step", "env.step")
+        self._wrap_method(env, "get_state", "env.get_state")
+        self._wrap_method(agent, "select_action", "select_action", q_table_owner=agent)
+        self._wrap_method(agent, "learn", "learn", q_table_owner=agent)
+        self._wrap_method(agent, "experience_replay", "experience_replay")
+        for name in ("progress", "state_update"):
+            self._wrap_signal(thread, name)
+
+    def detach(self):
+        # Sarmalayıcıları kaldırır; sınıf metotları/sinyalleri tekrar doğrudan kullanılır.
+        for obj, name in reversed(self._patched):
+            if name in obj.__dict__:
+                delattr(obj, name)
+        self._patched = []
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        if self.profile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            directory = os.path.dirname(self.profile_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._cprofile.dump_stats(self.profile_path) # pstats.Stats(profile_path) ile incelenebilir.
+            self._cprofile = None
+        if self._start_time is not None:
+            self.wall_time += time.perf_counter() - self._start_time
+            self._start_time = None
+
+    def episode_finished(self, episode):
+        # Her episode sonunda çağrılır; gerekirse periyodik rapor üretir.
+        self.counters["episodes"] += 1
+        if self.report_interval and episode % self.report_interval == 0 and self.report_callback:
+            self.report_callback(self.format_report())
+
+    def report(self):
+        # Ölçümleri sözlük olarak döndürür.
+        phases = {}
+        for phase, (calls, total) in self.timings.items():
+            phases[phase] = {
+                "calls": calls,
+                "total_s": total,
+                "mean_us": 1e6 * total / calls if calls else 0.0,
+            }
+        return {"phases": phases, "counters": dict(self.counters), "wall_time_s": self.wall_time}
+
+    def format_report(self):
+        # Ölçümleri okunabilir metin olarak döndürür.
+        data = self.report()
+        lines = [f"{'Faz':<20}{'Çağrı':>10}{'Toplam (s)':>12}{'Ort. (µs)':>12}"]
+        for phase, values in data["phases"].items():
+            lines.append(f"{phase:<20}{values['calls']:>10}{values['total_s']:>12.3f}{values['mean_us']:>12.1f}")
+        counters = data["counters"]
+        lines.append(f"Yeni durum: {counters['new_states']} | Deneyim tekrarı: {counters['replay_calls']} | "
+                     f"Sinyal: {counters['signal_emits']} | Episode: {counters['episodes']}")
+        return "\n".join(lines)
+
+# =====================
+# Model Kayıt Defteri (Registry)
+# =====================
+MODEL_FILE_PATTERN = re.compile(r"qtable_(\d+)_\w+\.pkl$") # models/qtable_<grid>_<rastgele>.pkl
+
+def model_metadata_path(model_path):
+    # Modelin yan (sidecar) metadata dosyası: qtable_5_1234.pkl -> qtable_5_1234.json
+    return os.path.splitext(model_path)[0] + ".json"
+
+def write_model_metadata(model_path, agent, **extra):
+    # Ajanın Q-tablosu için metadata dosyası yazar; registry tabloyu açmadan bu dosyayı okur.
+    metadata = {
+        "grid_size": agent.env.grid_size,
+        "max_steps": agent.env.max_steps,
+        "dtype": agent.dtype.str,
+        "state_format": "tuple",
+        "n_states": len(agent.q_table),
+        "created": time.time(),
+    }
+    metadata.update(extra)
+    with open(model_metadata_path(model_path), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+class ModelRegistry:
+    """
+    models/ dizinindeki Q-tablolarının indeksi:
+    - scan() sadece yan metadata dosyalarını (.json) okur; yoksa grid boyutu dosya adından çıkarılır
+    - Ortam yapılandırması (grid boyutu, maksimum adım, etiket) -> model eşlemesi sözlükte tutulur (O(1))
+    - Tablolar ilk kullanımda yüklenir ve toplam boyutu max_bytes ile sınırlı bir LRU önbellekte tutulur
+    """
+    def __init__(self, directory="models", max_bytes=256 * 1024 * 1024):
+        self.directory = directory # Model dizini.
+        self.max_bytes = max_bytes # Önbellekteki tabloların toplam (yaklaşık) bellek sınırı.
+        self.entries = {} # model yolu -> metadata
+        self.index = {} # (grid_size, max_steps, tag) -> model yolu
+        self.cache_bytes = 0 # Önbellekteki tabloların toplam boyutu.
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict() # model yolu -> (Q-tablosu, byte); en son kullanılan sonda.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def config_key(grid_size, max_steps=100, tag=None):
+        return (grid_size, max_steps, tag)
+
+    def _read_metadata(self, path):
+        metadata_path = model_metadata_path(path)
+        if os.path.exists(metadata_path):
+            with open(metadata_path, encoding='utf-8') as f:
+                metadata = json.load(f)
+        else:
+            match = MODEL_FILE_PATTERN.search(os.path.basename(path))
+            if not match:
+                return None
+            # Metadata'sız eski model: grid boyutu dosya adından, diğer alanlar varsayılan.
+            metadata = {"grid_size": int(match.group(1)), "max_steps": 100, "state_format": "unknown"}
+        metadata.setdefault("max_steps", 100)
+        metadata["path"] = path
+        metadata["file_bytes"] = os.path.getsize(path)
+        metadata.setdefault("created", os.path.getmtime(path))
+        return metadata
+
+    def scan(self):
+        # Dizindeki modelleri tablolarını yüklemeden indeksler; indekslenen model sayısını döndürür.
+        self.entries = {}
+        self.index = {}
+        if not os.path.isdir(self.directory):
+            return 0
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".pkl"):
+                continue
+            metadata = self._read_metadata(os.path.join(self.directory, name))
+            if metadata is None or metadata.get("state_format") == "hashed":
+                continue # Hashlenmiş int anahtarlı eski tablolar mevcut get_state ile kullanılamaz.
+            self.entries[metadata["path"]] = metadata
+            key = self.config_key(metadata["grid_size"], metadata["max_steps"], metadata.get("tag"))
+            current = self.index.get(key)
+            # Aynı yapılandırma için başarı oranı yüksek (yoksa daha yeni) model tercih edilir.
+            rank = (metadata.get("success_rate", -1), metadata["created"])
+            if current is None or rank > (self.entries[current].get("success_rate", -1), self.entries[current]["created"]):
+                self.index[key] = metadata["path"]
+        return len(self.entries)
+
+    def find(self, grid_size, max_steps=100, tag=None):
+        # Yapılandırmaya uygun modelin metadata'sını döndürür (yoksa None).
+        path = self.index.get(self.config_key(grid_size, max_steps, tag))
+        return self.entries.get(path) if path else None
+
+    def find_for_env(self, env, tag=None):
+        return self.find(env.grid_size, env.max_steps, tag)
+
+    def get_table(self, path):
+        # Tabloyu önbellekten döndürür; yoksa diskten yükler ve LRU sınırını uygular.
+        # Dönen tablo paylaşılır: eğitilecekse load_into(copy=True) kullanın.
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None:
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[0]
+        with open(path, 'rb') as f:
+            q_table = pickle.load(f)
+        size = q_table_memory_usage(q_table)["total_bytes"]
+        with self._lock:
+            self.misses += 1
+            if path not in self._cache:
+                self._cache[path] = (q_table, size)
+                self.cache_bytes += size
+            self._evict()
+            return q_table
+
+    def _evict(self):
+        # En uzun süredir kullanılmayan tabloları sınır aşılmayana kadar önbellekten çıkarır (en yeni tablo kalır).
+        while self.cache_bytes > self.max_bytes and len(self._cache) > 1:
+            _, (_, size) = self._cache.popitem(last=False)
+            self.cache_bytes -= size
+
+    def get_for_env(self, env, tag=None):
+        # Ortama uygun Q-tablosunu döndürür (yoksa None).
+        metadata = self.find_for_env(env, tag)
+        return self.get_table(metadata["path"]) if metadata else None
+
+    def load_into(self, agent, tag=None, copy=True):
+        # Ajanın ortamına uygun modeli ajana yükler ve model yolunu döndürür (yoksa None).
+        # copy=False paylaşılan tabloyu doğrudan kullanır; sadece donmuş (inference) ajanlar için uygundur.
+        metadata = self.find_for_env(agent.env, tag)
+        if metadata is None:
+            return None
+        q_table = self.get_table(metadata["path"])
+        if copy:
+            agent.set_q_table({state: row.copy() for state, row in q_table.items()})
+        else:
+            agent.q_table = q_table
+            agent.freeze()
+        return metadata["path"]
+
+    def cached_paths(self):
+        with self._lock:
+            return list(self._cache.keys())
+
+# =====================
+# Değerlendirme Yardımcıları
+# =====================
+def train_episodes(env, agent, episodes):
+    # Arayüzsüz eğitim döngüsü; toplam gerçek ortam adımı sayısını döndürür.
+    env_steps = 0
+    for _ in range(episodes):
+        state = env.reset()
+        done = False
+        while not done:
+            action = agent.select_action(state, training=True)
+            next_state, reward, done, _ = env.step(action)
+            agent.learn(state, action, reward, next_state, done)
+            state = next_state
+        env_steps += env.steps
+        agent.decay_epsilon()
+    return env_steps
+
+def evaluate_greedy_policy(env, agent, episodes=100):
+    # Ajanı keşif yapmadan (greedy) çalıştırır ve başarı oranını döndürür.
+    successes = 0
+    total_reward = 0
+    total_steps = 0
+    for _ in range(episodes):
+        state = env.reset()
+        done = False
+        while not done:
+            action = agent.select_action(state, training=False)
+            state, reward, done, _ = env.step(action)
+            total_reward += reward
+        successes += int(all(env.delivered))
+        total_steps += env.steps
+    return {
+        "success_rate": successes / episodes if episodes else 0.0,
+        "avg_reward": total_reward / episodes if episodes else 0.0,
+        "avg_steps": total_steps / episodes if episodes else 0.0,
+    }
+
+def compare_planning_efficiency(grid_size=5, episodes=500, planning_budgets=(0, 5, 20), eval_episodes=200, seed=0):
+    # Farklı Dyna-Q planlama bütçeleriyle aynı sayıda episode eğitip
+    # gerçek ortam adımı başına elde edilen başarıyı karşılaştırır.
+    results = []
+    for budget in planning_budgets:
+        random.seed(seed); np.random.seed(seed)
+        env = DroneDeliveryEnv(grid_size=grid_size)
+        agent = QLearningAgent(env, planning_steps=budget)
+        env_steps = train_episodes(env, agent, episodes)
+        evaluation = evaluate_greedy_policy(env, agent, eval_episodes)
+        stats = agent.sample_efficiency_stats()
+        results.append({
+            "planning_steps": budget,
+            "env_steps": env_steps,
+            "success_rate": evaluation["success_rate"],
+            "avg_reward": evaluation["avg_reward"],
+            "updates_per_real_step": stats["updates_per_real_step"],
+            "success_per_1k_env_steps": 1000 * evaluation["success_rate"] / env_steps if env_steps else 0.0,
+        })
+    return results
+
+# =====================
+# Alt Süreçli Asenkron Vektör Ortam
+# =====================
+STATE_MAX_LEN = 4 + MAX_DELIVERIES + 1 + MAX_DELIVERIES # x, y, kargo, uçuş + teslimat bayrakları + batarya + teslimat indeksleri
+
+def _encode_state(state, out):
+    # Değişken uzunluklu durum tuple'ını sabit genişlikli int satıra yazar, uzunluğu döndürür.
+    n = len(state)
+    out[:n] = state
+    return n
+
+def _vector_env_worker(index, conn, buffers, env_kwargs, seed):
+    # Alt süreçte tek bir DroneDeliveryEnv çalıştırır. Eylemler, durumlar, ödüller ve
+    # bitti bayrakları paylaşılan bellekten okunur/yazılır; boru hattından sadece 1 byte'lık komut geçer.
+    actions, states, state_lens, terminal_states, terminal_lens, rewards, dones = [
+        np.frombuffer(buffer, dtype=dtype).reshape(shape) for buffer, dtype, shape in buffers]
+    if seed is not None:
+        random.seed(seed + index); np.random.seed(seed + index)
+    env = DroneDeliveryEnv(**env_kwargs)
+    try:
+        while True:
+            command = conn.recv_bytes()
+            if command == b"s": # step: bitince otomatik reset, son durum ayrı tampona yazılır
+                state, reward, done, _ = env.step(int(actions[index]))
+                rewards[index] = reward
+                dones[index] = done
+                if done:
+                    terminal_lens[index] = _encode_state(state, terminal_states[index])
+                    state = env.reset()
+                state_lens[index] = _encode_state(state, states[index])
+            elif command == b"r":
+                state_lens[index] = _encode_state(env.reset(), states[index])
+            elif command == b"c":
+                break
+            conn.send_bytes(b"k")
+    finally:
+        conn.close()
+
+class AsyncVectorEnv:
+    """
+    M adet DroneDeliveryEnv'i alt süreçlerde paralel çalıştıran vektör ortam:
+    - Eylem, durum, ödül ve bitti bayrakları önceden ayrılmış paylaşılan bellek dizilerindedir
+    - Süreçler arası sadece 1 byte'lık komut/onay mesajı gönderilir (pickle yok)
+    - Biten episode'lar alt süreçte otomatik sıfırlanır; son durum terminal_states ile alınır
+    """
+    def __init__(self, num_envs, grid_size=5, max_steps=100, seed=None, context=None):
+        self.num_envs = num_envs
+        self.action_space_n = 6
+        ctx = mp.get_context(context)
+        specs = [
+            ("i", np.int32, (num_envs,)),                   # eylemler
+            ("i", np.int32, (num_envs, STATE_MAX_LEN)),     # durumlar
+            ("i", np.int32, (num_envs,)),                   # durum uzunlukları
+            ("i", np.int32, (num_envs, STATE_MAX_LEN)),     # terminal durumlar
+            ("i", np.int32, (num_envs,)),                   # terminal durum uzunlukları
+            ("d", np.float64, (num_envs,)),                 # ödüller
+            ("b", np.int8, (num_envs,)),                    # bitti bayrakları
+        ]
+        buffers = [(ctx.RawArray(code, int(np.prod(shape))), dtype, shape) for code, dtype, shape in specs]
+        (self.actions, self.states, self.state_lens, self.terminal_states,
+         self.terminal_lens, self.rewards, self.dones) = [
+            np.frombuffer(buffer, dtype=dtype).reshape(shape) for buffer, dtype, shape in buffers]
+        env_kwargs = {"grid_size": grid_size, "max_steps": max_steps}
+        self.connections = []
+        self.processes = []
+        for index in range(num_envs):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_vector_env_worker, args=(index, child_conn, buffers, env_kwargs, seed), daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        self.closed = False
+
+    def _broadcast(self, command):
+        for conn in self.connections:
+            conn.send_bytes(command)
+        for conn in self.connections:
+            conn.recv_bytes()
+
+    def _decode(self, states, lens, indices=None):
+        indices = range(self.num_envs) if indices is None else indices
+        return [tuple(states[i, :lens[i]].tolist()) for i in indices]
+
+    def reset(self):
+        # Tüm ortamları sıfırlar ve başlangıç durumlarını döndürür.
+        self._broadcast(b"r")
+        return self._decode(self.states, self.state_lens)
+
+    def step_async(self, actions):
+        # Eylemleri paylaşılan belleğe yazar ve alt süreçleri tetikler.
+        self.actions[:] = actions
+        for conn in self.connections:
+            conn.send_bytes(b"s")
+
+    def step_wait(self):
+        # Tüm alt süreçlerin adımı bitirmesini bekler.
+        # Dönüş: (durumlar, ödüller, bitti bayrakları, terminal durumlar).
+        # Biten ortamların durumu yeni episode'un başlangıcıdır; terminal durumu terminal_states[i]'dedir.
+        for conn in self.connections:
+            conn.recv_bytes()
+        dones = self.dones.astype(bool)
+        terminal_states = [None] * self.num_envs
+        for i in np.flatnonzero(dones):
+            terminal_states[i] = tuple(self.terminal_states[i, :self.terminal_lens[i]].tolist())
+        return self._decode(self.states, self.state_lens), self.rewards.copy(), dones, terminal_states
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        for conn in self.connections:
+            try:
+                conn.send_bytes(b"c")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.connections:
+            conn.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def train_vectorized(vec_env, agent, episodes):
+    # Vektör ortamda toplam 'episodes' episode bitene kadar eğitir; toplam gerçek adım sayısını döndürür.
+    # Epsilon her biten episode'da bir kez azaltılır (tek ortamlı eğitimle aynı takvim).
+    states = vec_env.reset()
+    finished = 0
+    env_steps = 0
+    while finished < episodes:
+        actions = [agent.select_action(state, training=True) for state in states]
+        next_states, rewards, dones, terminal_states = vec_env.step(actions)
+        env_steps += vec_env.num_envs
+        for i in range(vec_env.num_envs):
+            next_state = terminal_states[i] if dones[i] else next_states[i]
+            agent.learn(states[i], actions[i], float(rewards[i]), next_state, bool(dones[i]))
+            if dones[i]:
+                finished += 1
+                agent.decay_epsilon()
+        states = next_states
+    return env_steps
+
+# =====================
+# Parametre Sunucusu (Çok Makineli Eğitim)
+# =====================
+# Çerçeve: 1 byte mesaj tipi + 4 byte yük uzunluğu (big-endian), ardından zlib ile sıkıştırılmış yük.
+PS_PUSH, PS_PULL, PS_VERSION, PS_REPLY = 1, 2, 3, 4
+_PS_HEADER = struct.Struct("!BI")
+_PS_COUNT = struct.Struct("!I")
+_PS_VERSION = struct.Struct("!Q")
+
+def _ps_send(sock, msg_type, payload):
+    data = zlib.compress(payload, 1)
+    sock.sendall(_PS_HEADER.pack(msg_type, len(data)) + data)
+    return _PS_HEADER.size + len(data)
+
+def _ps_recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Parametre sunucusu bağlantısı kapandı.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def _ps_recv(sock):
+    msg_type, length = _PS_HEADER.unpack(_ps_recv_exact(sock, _PS_HEADER.size))
+    return msg_type, zlib.decompress(_ps_recv_exact(sock, length))
+
+def _pack_states(states):
+    # Durum tuple'larını sabit genişlikli int16 satırlar + uzunluklar olarak paketler.
+    states_array = np.zeros((len(states), STATE_MAX_LEN), dtype=np.int16)
+    lens = np.zeros(len(states), dtype=np.uint8)
+    for i, state in enumerate(states):
+        lens[i] = _encode_state(state, states_array[i])
+    return _PS_COUNT.pack(len(states)) + states_array.tobytes() + lens.tobytes()
+
+def _unpack_states(payload, offset=0):
+    # _pack_states çıktısını çözer; (durumlar, sonraki offset) döndürür.
+    (n,) = _PS_COUNT.unpack_from(payload, offset)
+    offset += _PS_COUNT.size
+    states_array = np.frombuffer(payload, dtype=np.int16, count=n * STATE_MAX_LEN, offset=offset).reshape(n, STATE_MAX_LEN)
+    offset += states_array.nbytes
+    lens = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset)
+    offset += lens.nbytes
+    return [tuple(states_array[i, :lens[i]].tolist()) for i in range(n)], offset
+
+class ParameterServer:
+    """
+    Ana Q-tablosunu tutan TCP parametre sunucusu:
+    - PUSH: işçilerden (durum, eylem, ΔQ) seyrek delta batch'leri alır ve 1/n_workers ölçeğiyle ana tabloya ekler
+      (her işçi eski bir kopyaya göre öğrendiği için tam deltaları toplamak değerleri işçi sayısıyla katlar)
+    - İşçide yeni olan durumlar delta değil değer olarak gelir: ana tabloda yoksa yazılır, varsa aynı ölçekle ortalanır
+    - PULL: verilen sürümden sonra değişen satırları döndürür (trafik tablo boyutuna değil değişikliklere bağlıdır)
+    - Her PUSH sürümü (version) bir artırır; işçiler gecikmelerini buna göre sınırlar
+    ΔQ'lar float64 gönderilir; ana ve yerel tablolar float64 olduğundan yuvarlama kayması oluşmaz.
+    """
+    def __init__(self, host="127.0.0.1", port=0, action_space_n=6, change_log_size=10000, n_workers=None):
+        self.action_space_n = action_space_n
+        self.n_workers = n_workers # Delta ölçeği için işçi sayısı (None: açık bağlantı sayısı kullanılır).
+        self.active_clients = 0
+        self.q_table = {} # Ana Q-tablosu.
+        self.version = 0 # Uygulanan PUSH batch sayısı.
+        self.row_versions = {} # durum -> satırın son değiştiği sürüm
+        self.change_log = {} # sürüm -> o PUSH'ta değişen durumlar (son change_log_size sürüm)
+        self.change_log_size = change_log_size
+        self.lock = threading.Lock()
+        server = self
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with server.lock:
+                    server.active_clients += 1
+                try:
+                    while True:
+                        try:
+                            msg_type, payload = _ps_recv(self.request)
+                        except (ConnectionError, OSError):
+                            return
+                        _ps_send(self.request, PS_REPLY, server.handle_message(msg_type, payload))
+                finally:
+                    with server.lock:
+                        server.active_clients -= 1
+        self._server = socketserver.ThreadingTCPServer((host, port), _Handler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self.address = self._server.server_address # (host, port); port=0 ise işletim sistemi seçer.
+        self._thread = None
+
+    def handle_message(self, msg_type, payload):
+        # Tek bir isteği işler ve yanıt yükünü döndürür.
+        if msg_type == PS_PUSH:
+            states, offset = _unpack_states(payload)
+            n = len(states)
+            actions = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset)
+            deltas = np.frombuffer(payload, dtype=np.float64, count=n, offset=offset + n)
+            new_flags = np.frombuffer(payload, dtype=np.uint8, count=n, offset=offset + 9 * n)
+            with self.lock:
+                self.version += 1
+                scale = 1.0 / max(1, self.n_workers or self.active_clients)
+                created = set() # Bu PUSH'ta ana tabloya ilk kez eklenen durumlar.
+                for state, action, delta, is_new in zip(states, actions.tolist(), deltas.tolist(), new_flags.tolist()):
+                    row = self.q_table.get(state)
+                    if row is None:
+                        row = self.q_table[state] = np.zeros(self.action_space_n)
+                        created.add(state)
+                    if is_new and state in created: # İlk keşfeden işçinin değeri olduğu gibi alınır.
+                        row[action] = delta
+                    elif is_new: # delta burada işçinin mutlak değeridir.
+                        row[action] += scale * (delta - row[action])
+                    else:
+                        row[action] += scale * delta
+                    self.row_versions[state] = self.version
+                self.change_log[self.version] = set(states)
+                self.change_log.pop(self.version - self.change_log_size, None)
+                return _PS_VERSION.pack(self.version)
+        if msg_type == PS_PULL:
+            (since,) = _PS_VERSION.unpack(payload)
+            with self.lock:
+                version = self.version
+                if version - since <= self.change_log_size: # Değişiklik günlüğünden topla.
+                    changed = set()
+                    for v in range(since + 1, version + 1):
+                        changed.update(self.change_log.get(v, ()))
+                else: # Günlükten daha eski: satır sürümlerini tara.
+                    changed = {state for state, v in self.row_versions.items() if v > since}
+                states = list(changed)
+                rows = np.array([self.q_table[state] for state in states]).reshape(len(states), self.action_space_n)
+            return _PS_VERSION.pack(version) + _pack_states(states) + rows.tobytes()
+        if msg_type == PS_VERSION:
+            with self.lock:
+                return _PS_VERSION.pack(self.version)
+        raise ValueError(f"Bilinmeyen mesaj tipi: {msg_type}")
+
+    def start(self):
+        # Sunucuyu arka plan thread'inde başlatır.
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class ParameterServerClient:
+    # Parametre sunucusuna kalıcı TCP bağlantısı üzerinden ikili çerçeveli istek gönderen istemci.
+    def __init__(self, host, port, action_space_n=6, timeout=30):
+        self.action_space_n = action_space_n
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.bytes_sent = 0 # Sıkıştırılmış gönderilen byte (enstrümantasyon).
+
+    def _request(self, msg_type, payload):
+        self.bytes_sent += _ps_send(self.sock, msg_type, payload)
+        reply_type, reply = _ps_recv(self.sock)
+        if reply_type != PS_REPLY:
+            raise ConnectionError(f"Beklenmeyen yanıt tipi: {reply_type}")
+        return reply
+
+    def push(self, states, actions, deltas, new_flags=None):
+        # Seyrek ΔQ batch'ini gönderir, sunucunun yeni sürümünü döndürür.
+        # new_flags[i] işaretliyse deltas[i] işçide yeni olan durumun mutlak değeridir.
+        payload = (_pack_states(states) + np.asarray(actions, dtype=np.uint8).tobytes()
+                   + np.asarray(deltas, dtype=np.float64).tobytes()
+                   + np.asarray(new_flags if new_flags is not None else np.zeros(len(states)), dtype=np.uint8).tobytes())
+        return _PS_VERSION.unpack(self._request(PS_PUSH, payload))[0]
+
+    def pull(self, since_version=0):
+        # since_version'dan sonra değişen satırları çeker; (sürüm, {durum: satır}) döndürür.
+        reply = self._request(PS_PULL, _PS_VERSION.pack(since_version))
+        (version,) = _PS_VERSION.unpack_from(reply)
+        states, offset = _unpack_states(reply, _PS_VERSION.size)
+        rows = np.frombuffer(reply, dtype=np.float64, count=len(states) * self.action_space_n,
+                             offset=offset).reshape(len(states), self.action_space_n)
+        return version, {state: rows[i].copy() for i, state in enumerate(states)}
+
+    def version(self):
+        return _PS_VERSION.unpack(self._request(PS_VERSION, b""))[0]
+
+    def close(self):
+        self.sock.close()
+
+class ParameterServerWorker:
+    """
+    Bir QLearningAgent'ı parametre sunucusuyla senkronize eden işçi:
+    - sync(): son senkronizasyondan beri değişen satırların ΔQ'larını seyrek batch olarak gönderir
+    - Sunucu sürümü, işçinin son çektiği sürümden max_staleness'tan fazla ilerlemişse yerel tablo yenilenir
+    Not: Değişen satırlar ajanın kirli (dirty) kümesinden alınır; aynı ajanla CheckpointManager birlikte kullanılmamalıdır.
+    """
+    def __init__(self, agent, host, port, max_staleness=4):
+        self.agent = agent
+        self.client = ParameterServerClient(host, port, action_space_n=agent.env.action_space_n)
+        self.max_staleness = max_staleness # İzin verilen en fazla sürüm gecikmesi.
+        self.base = {} # Son senkronizasyondaki satırlar (ΔQ = yerel - base).
+        self.synced_version = 0 # Son çekilen sunucu sürümü.
+        self.own_pushes = 0 # Son çekmeden beri bu işçinin yaptığı PUSH sayısı.
+        self.pushed_entries = 0
+        self.pulls = 0
+        self.pulled_rows = 0 # Çekilen toplam satır sayısı (yalnızca değişenler).
+
+    def sync(self):
+        # Yerel değişiklikleri gönderir, gerekirse ana tablodan günceller; sunucu sürümünü döndürür.
+        rows = self.agent.pop_dirty_rows()
+        states, actions, deltas, new_flags = [], [], [], []
+        for state, row in rows.items():
+            base = self.base.get(state)
+            delta = row - base if base is not None else row # Yeni durum: değer olarak gönderilir.
+            for action in np.flatnonzero(delta):
+                states.append(state); actions.append(action); deltas.append(delta[action])
+                new_flags.append(base is None)
+            self.base[state] = row
+        version = self.client.push(states, actions, deltas, new_flags)
+        self.pushed_entries += len(states)
+        self.own_pushes += 1
+        if version - self.synced_version - self.own_pushes > self.max_staleness:
+            self.pull()
+        return version
+
+    def pull(self):
+        # Son çekilen sürümden sonra ana tabloda değişen satırları yerel tabloya uygular.
+        version, rows = self.client.pull(self.synced_version)
+        for state, row in rows.items():
+            local = self.agent.q_table.get(state)
+            if local is None: # Başka işçilerin keşfettiği durum.
+                self.agent.q_table[state] = row.astype(self.agent.dtype)
+            else:
+                local[:] = row # Yerel satır nesnesi korunur (select_action referansları geçerli kalır).
+            self.base[state] = self.agent.q_table[state].copy()
+        self.synced_version = version
+        self.own_pushes = 0
+        self.pulls += 1
+        self.pulled_rows += len(rows)
+
+    def close(self):
+        self.client.close()
+
+def train_worker(env, agent, worker, episodes, sync_interval=10):
+    # İşçi eğitim döngüsü: her sync_interval episode'da bir sunucuyla senkronize olur.
+    env_steps = 0
+    done_episodes = 0
+    while done_episodes < episodes:
+        chunk = min(sync_interval, episodes - done_episodes)
+        env_steps += train_episodes(env, agent, chunk)
+        done_episodes += chunk
+        worker.sync()
+    worker.pull()
+    return env_steps
+
+# =====================
+# Grid Boyutları Arası Aktarım ve Müfredat (Curriculum) Eğitimi
+# =====================
+def _map_axis(value, target_size, source_size):
+    # Hedef griddeki bir koordinatı, en yakın kenara olan uzaklığı koruyarak kaynak gride eşler.
+    # Depo ve teslimat noktaları köşelerde olduğu için kenara göreli konum anlamlıdır.
+    half = (source_size - 1) // 2
+    if value <= target_size - 1 - value:
+        return min(value, half)
+    return source_size - 1 - min(target_size - 1 - value, half)
+
+def transfer_q_table(q_table, source_size, target_size):
+    """
+    Bir grid boyutunda öğrenilmiş Q-tablosunu başka bir grid boyutuna aktarır.
+    Durumdaki (x, y) dışındaki alanlar (kargo, uçuş, teslimatlar, batarya, köşe indeksleri)
+    grid boyutundan bağımsızdır; koordinatlar kenara göreli eşlenir. Kaynak tabloda
+    görülmüş her durum, ona eşlenen tüm hedef koordinatlara kopyalanır.
+    Eski (hashlenmiş int anahtarlı) tablolar aktarılamaz, bu anahtarlar atlanır.
+    """
+    inverse = {}
+    for value in range(target_size):
+        inverse.setdefault(_map_axis(value, target_size, source_size), []).append(value)
+    transferred = {}
+    for state, row in q_table.items():
+        if not isinstance(state, tuple):
+            continue
+        x, y = int(state[0]), int(state[1])
+        rest = state[2:]
+        for tx in inverse.get(x, ()):
+            for ty in inverse.get(y, ()):
+                transferred[(tx, ty) + rest] = row.copy()
+    return transferred
+
+class CurriculumTrainer:
+    """
+    Küçük gridden büyüğe müfredat eğitimi (ör: 3x3 -> 5x5 -> 7x7):
+    - Her aşama, kayan greedy başarı platoya ulaşana (veya verilirse başarı hedefine) ya da episode sınırına kadar eğitilir
+    - Sonraki aşamanın ajanı, önceki tablonun koordinat-göreli aktarımıyla sıcak başlar
+    - Aşama başına episode, gerçek ortam adımı ve başarı oranı raporlanır
+    - compare_cold=True ile son grid boyutu soğuk başlangıçtan da eğitilir: müfredatın son başarısına ulaşmak
+      için gereken ortam adımı ve aynı toplam adımdaki başarı raporlanır (tasarrufun ölçümü)
+    Ulaşılabilir başarı grid boyutuna göre ~0.6 civarında kaldığından mutlak hedef varsayılan olarak kapalıdır.
+    """
+    def __init__(self, grid_sizes=(3, 5, 7), max_episodes_per_stage=5000, target_success=None,
+                 eval_interval=250, eval_episodes=100, warm_epsilon=0.3, agent_kwargs=None,
+                 plateau_tolerance=0.03, plateau_window=3, plateau_patience=2):
+        self.grid_sizes = list(grid_sizes) # Aşamaların grid boyutları (küçükten büyüğe).
+        self.max_episodes_per_stage = max_episodes_per_stage # Aşama başına en fazla eğitim episode'u.
+        self.target_success = target_success # Verilirse, bir sonraki aşamaya geçmek için yeterli greedy başarı oranı.
+        self.plateau_tolerance = plateau_tolerance # Kayan başarının ölçümler arası en fazla değişimi (None: kapalı).
+        self.plateau_window = plateau_window # Kayan başarının kaç ölçümün ortalaması olduğu.
+        self.plateau_patience = plateau_patience # Platonun art arda kaç ölçüm sürmesi gerektiği.
+        self.eval_interval = eval_interval # Kaç episode'da bir başarı ölçüleceği.
+        self.eval_episodes = eval_episodes # Her ölçümde kullanılan episode sayısı.
+        self.warm_epsilon = warm_epsilon # Aktarılmış tabloyla başlayan aşamaların başlangıç epsilon'u.
+        self.agent_kwargs = agent_kwargs or {} # QLearningAgent'a iletilecek ek parametreler.
+        self.stages = [] # Aşama sonuçları.
+        self.cold_stage = None # Son grid boyutunun soğuk başlangıç temel çizgisi (compare_cold=True ise).
+
+    def train_stage(self, grid_size, q_table=None):
+        # Tek bir aşamayı eğitir; (ajan, aşama raporu) döndürür.
+        env = DroneDeliveryEnv(grid_size=grid_size)
+        agent = QLearningAgent(env, **self.agent_kwargs)
+        if q_table:
+            agent.set_q_table(q_table)
+            agent.epsilon = self.warm_epsilon
+        eval_env = DroneDeliveryEnv(grid_size=grid_size) # Değerlendirme eğitim ortamını bozmaz.
+        episodes = 0
+        env_steps = 0
+        success_rates = [] # Her ölçümün greedy başarı oranı.
+        rolling = None
+        plateau_count = 0
+        stop_reason = "max_episodes"
+        while episodes < self.max_episodes_per_stage:
+            chunk = min(self.eval_interval, self.max_episodes_per_stage - episodes)
+            env_steps += train_episodes(env, agent, chunk)
+            episodes += chunk
+            success_rates.append(evaluate_greedy_policy(eval_env, agent, self.eval_episodes)["success_rate"])
+            if self.target_success is not None and success_rates[-1] >= self.target_success:
+                stop_reason = "target"
+                break
+            if self.plateau_tolerance is None or len(success_rates) < self.plateau_window:
+                continue
+            previous, rolling = rolling, sum(success_rates[-self.plateau_window:]) / self.plateau_window
+            if previous is not None and abs(rolling - previous) <= self.plateau_tolerance:
+                plateau_count += 1
+                if plateau_count >= self.plateau_patience:
+                    stop_reason = "plateau"
+                    break
+            else:
+                plateau_count = 0
+        stage = {
+            "grid_size": grid_size,
+            "warm_start": bool(q_table),
+            "episodes": episodes,
+            "env_steps": env_steps,
+            "success_rate": success_rates[-1] if success_rates else 0.0,
+            "rolling_success": rolling if rolling is not None else (success_rates[-1] if success_rates else 0.0),
+            "stop_reason": stop_reason,
+            "n_states": len(agent.q_table),
+        }
+        return agent, stage
+
+    def run(self, compare_cold=False):
+        # Tüm aşamaları sırayla eğitir ve son aşamanın ajanını döndürür.
+        # compare_cold=True ise son grid boyutu için soğuk başlangıç temel çizgisi de ölçülür (bkz. report()).
+        self.stages = []
+        self.cold_stage = None
+        agent = None
+        for grid_size in self.grid_sizes:
+            q_table = None
+            if agent is not None:
+                q_table = transfer_q_table(agent.q_table, agent.env.grid_size, grid_size)
+            agent, stage = self.train_stage(grid_size, q_table)
+            self.stages.append(stage)
+        if compare_cold:
+            self.cold_stage = self.cold_start_baseline(self.stages[-1]["rolling_success"], self.total_env_steps())
+        return agent
+
+    def cold_start_baseline(self, target_rolling_success, curriculum_env_steps, budget_factor=2.0):
+        # Son grid boyutunu soğuk başlangıçtan eğitir; kayan başarının hedefe ulaştığı ortam adımını ve
+        # müfredatla aynı toplam adımdaki kayan başarıyı ölçer. En fazla budget_factor * müfredat adımı harcanır.
+        grid_size = self.grid_sizes[-1]
+        env = DroneDeliveryEnv(grid_size=grid_size)
+        agent = QLearningAgent(env, **self.agent_kwargs)
+        eval_env = DroneDeliveryEnv(grid_size=grid_size)
+        budget = budget_factor * curriculum_env_steps
+        episodes = env_steps = 0
+        success_rates = []
+        rolling = 0.0
+        steps_to_target = None
+        success_at_equal_steps = None
+        while env_steps < budget and (steps_to_target is None or success_at_equal_steps is None):
+            env_steps += train_episodes(env, agent, self.eval_interval)
+            episodes += self.eval_interval
+            success_rates.append(evaluate_greedy_policy(eval_env, agent, self.eval_episodes)["success_rate"])
+            rolling = sum(success_rates[-self.plateau_window:]) / len(success_rates[-self.plateau_window:])
+            if steps_to_target is None and len(success_rates) >= self.plateau_window and rolling >= target_rolling_success:
+                steps_to_target = env_steps
+            if success_at_equal_steps is None and env_steps >= curriculum_env_steps:
+                success_at_equal_steps = rolling
+        return {
+            "grid_size": grid_size,
+            "episodes": episodes,
+            "env_steps": env_steps,
+            "target_rolling_success": target_rolling_success,
+            "env_steps_to_target": steps_to_target, # None: bütçe içinde ulaşılamadı.
+            "rolling_success_at_curriculum_steps": success_at_equal_steps,
+            "rolling_success": rolling,
+        }
+
+    def total_env_steps(self):
+        return sum(stage["env_steps"] for stage in self.stages)
+
+    def report(self):
+        # Müfredatın toplam maliyeti ve son aşama başarısını, varsa soğuk başlangıç temel çizgisiyle karşılaştırır.
+        final = self.stages[-1] if self.stages else {}
+        report = {
+            "stages": list(self.stages),
+            "curriculum_env_steps": self.total_env_steps(),
+            "final_rolling_success": final.get("rolling_success", 0.0),
+        }
+        if self.cold_stage is not None:
+            cold = self.cold_stage
+            report["cold_env_steps_to_target"] = cold["env_steps_to_target"]
+            report["cold_rolling_success_at_curriculum_steps"] = cold["rolling_success_at_curriculum_steps"]
+            # Müfredat adımı / soğuk başlangıcın aynı başarıya ulaştığı adım (<1: müfredat daha az hesap harcar).
+            if cold["env_steps_to_target"]:
+                report["env_step_ratio"] = report["curriculum_env_steps"] / cold["env_steps_to_target"]
+            else:
+                report["env_step_ratio"] = None # Soğuk başlangıç bütçe içinde ulaşamadı (en az 1/budget_factor kadar tasarruf).
+        return report
+
+# =====================
+# Yakınsama Takibi ve Erken Durdurma
+# =====================
+class ConvergenceMonitor:
+    """
+    Eğitim yakınsamasını pencere (window) bazında izler:
+    - Pencere boyunca max ve ortalama |ΔQ| (ajan tarafından artımlı tutulur)
+    - Q-tablosuna yeni durum ekleme oranı (gerçek adım başına)
+    - Kısa greedy değerlendirmelerle kayan başarı oranı ve bunun pencereler arası değişimi (plato)
+    Kriterler art arda 'patience' pencere boyunca sağlanırsa eğitim durdurulur (action="stop")
+    veya epsilon daha hızlı azaltılır (action="decay"). None verilen kriter kontrol edilmez;
+    ödül son bataryaya bağlı olduğundan max |ΔQ| sabit alpha ile sıfıra inmez, varsayılan olarak kapalıdır.
+    Ulaşılabilir başarı oranı ortama göre değiştiğinden (varsayılan 5x5'te ~0.6) mutlak başarı eşiği de
+    varsayılan olarak kapalıdır; bunun yerine kayan başarının platoya ulaşması beklenir. Ortalama |ΔQ| ve
+    yeni durum oranı da rastgele yerleşimler yüzünden sıfıra inmez; varsayılan eşikler 5x5 platosundaki
+    ölçülen seviyelere göre seçilmiştir.
+    """
+    def __init__(self, window=200, max_delta_threshold=None, mean_delta_threshold=0.75,
+                 new_state_rate_threshold=0.01, success_threshold=None, success_plateau_tolerance=0.05, patience=3,
+                 eval_episodes=20, success_window=5, action="stop", fast_decay=0.9):
+        self.window = window # Kaç episode'luk pencerelerle ölçüm yapılacağı.
+        self.max_delta_threshold = max_delta_threshold # Pencere içi max |ΔQ| üst sınırı.
+        self.mean_delta_threshold = mean_delta_threshold # Pencere içi ortalama |ΔQ| üst sınırı.
+        self.new_state_rate_threshold = new_state_rate_threshold # Gerçek adım başına yeni durum oranı üst sınırı.
+        self.success_threshold = success_threshold # Kayan greedy başarı oranı alt sınırı.
+        self.success_plateau_tolerance = success_plateau_tolerance # Kayan başarının pencereler arası en fazla değişimi.
+        self.patience = patience # Kriterlerin art arda sağlanması gereken pencere sayısı.
+        self.eval_episodes = eval_episodes # Her pencere sonunda yapılan greedy değerlendirme episode sayısı.
+        self.success_window = success_window # Kayan başarı oranının kaç pencerenin ortalaması olduğu.
+        self.action = action # "stop": eğitimi durdur, "decay": epsilon'u hızlı azalt.
+        self.fast_decay = fast_decay # "decay" modunda pencere başına ek epsilon çarpanı.
+        self.history = [] # Pencere ölçümleri.
+        self.converged_windows = 0 # Kriterlerin art arda sağlandığı pencere sayısı.
+        self.converged = False
+        self._episodes = 0
+        self._steps = 0
+        self._table_size = None
+        self._eval_env = None
+        self._success_rates = []
+
+    def _evaluate(self, agent):
+        # Eğitim ortamını bozmadan, ayrı bir ortamda ve tabloyu büyütmeden greedy başarı ölçer.
+        # Değerlendirme (reset ve eşitlik bozma) global RNG'leri kullanır; durumları geri yüklenir ki
+        # erken durdurma açıkken de eğitim gidişatı ve checkpoint'ten devam bit düzeyinde aynı kalsın.
+        python_state, numpy_state = random.getstate(), np.random.get_state()
+        was_frozen = agent.frozen
+        try:
+            if self._eval_env is None or self._eval_env.grid_size != agent.env.grid_size:
+                self._eval_env = DroneDeliveryEnv(grid_size=agent.env.grid_size, max_steps=agent.env.max_steps)
+            agent.freeze()
+            return evaluate_greedy_policy(self._eval_env, agent, self.eval_episodes)["success_rate"]
+        finally:
+            agent.frozen = was_frozen
+            random.setstate(python_state); np.random.set_state(numpy_state)
+
+    def episode_finished(self, agent, episode_steps):
+        # Her episode sonunda çağrılır. Eğitim durdurulmalıysa True döndürür.
+        if self._table_size is None:
+            self._table_size = len(agent.q_table)
+        self._episodes += 1
+        self._steps += episode_steps
+        if self._episodes < self.window:
+            return False
+        delta_stats = agent.pop_delta_stats()
+        new_states = len(agent.q_table) - self._table_size
+        self._success_rates = (self._success_rates + [self._evaluate(agent)])[-self.success_window:]
+        success_rate = sum(self._success_rates) / len(self._success_rates)
+        previous = self.history[-1]["success_rate"] if self.history else None
+        # Kayan ortalama dolmadan plato kabul edilmez.
+        success_change = abs(success_rate - previous) if previous is not None and len(self._success_rates) == self.success_window else float("inf")
+        record = {
+            "max_delta": delta_stats["max_delta"],
+            "mean_delta": delta_stats["mean_delta"],
+            "new_state_rate": new_states / self._steps if self._steps else 0.0,
+            "success_rate": success_rate,
+            "success_change": success_change,
+            "epsilon": agent.epsilon,
+        }
+        checks = [
+            (self.max_delta_threshold, record["max_delta"] <= (self.max_delta_threshold or 0)),
+            (self.mean_delta_threshold, record["mean_delta"] <= (self.mean_delta_threshold or 0)),
+            (self.new_state_rate_threshold, record["new_state_rate"] <= (self.new_state_rate_threshold or 0)),
+            (self.success_threshold, record["success_rate"] >= (self.success_threshold or 0)),
+            (self.success_plateau_tolerance, success_change <= (self.success_plateau_tolerance or 0)),
+        ]
+        record["converged"] = all(ok for threshold, ok in checks if threshold is not None)
+        self.history.append(record)
+        self._episodes = 0
+        self._steps = 0
+        self._table_size = len(agent.q_table)
+        self.converged_windows = self.converged_windows + 1 if record["converged"] else 0
+        self.converged = self.converged_windows >= self.patience
+        if self.converged and self.action == "decay":
+            agent.epsilon = max(agent.min_epsilon, agent.epsilon * self.fast_decay)
+            return False
+        return self.converged and self.action == "stop"
+
+# =====================
+# Diferansiyel Fuzz Testi (Referans vs Aday Uygulama)
+# =====================
+ENV_FIELDS = ("drone_pos", "battery", "has_cargo", "is_flying", "delivered", "steps", "done", "delivery_indices", "cargo_depot_pos")
+
+def _env_snapshot(env):
+    # Karşılaştırma için ortamın gözlemlenebilir iç durumu (her adımda çağrıldığı için hafif tutulur).
+    snapshot = []
+    for field in ENV_FIELDS:
+        value = getattr(env, field)
+        snapshot.append(value.tolist() if isinstance(value, np.ndarray) else list(value) if isinstance(value, list) else value)
+    return snapshot
+
+def _seed_global_rngs(seed):
+    # Global RNG'leri (random + NumPy) aynı tohumla kurar; durum kopyalamaktan çok daha ucuzdur.
+    random.seed(seed); np.random.seed(seed)
+
+def _rng_digest():
+    # RNG tüketiminin ucuz özeti: aynı tohumdan aynı miktar tüketildiyse sonraki çekilişler de aynıdır.
+    return random.random(), np.random.random_sample()
+
+class DifferentialFuzzer:
+    """
+    Hızlandırılmış (aday) ortam/ajan uygulamalarını referans uygulamayla bit düzeyinde karşılaştırır:
+    - Her iki taraf aynı tohumla reset edilir ve aynı tohumlu rastgele eylem akışıyla sürülür
+    - Her adımda durum, ödül, bitti bayrağı, iç alanlar (ve istenirse info) karşılaştırılır
+    - Ajan fabrikaları verilirse her geçiş için learn() çağrılır; Q satırları ve RNG tüketimi de karşılaştırılır
+    - İlk farklılıkta trajektori ddmin tarzı parça/çift silmeyle küçültülür ve raporlanır; ajan farklılıkları
+      kayıtlı reset tohumu ve adım başına learn() tohumlarıyla yeniden oynatılarak küçültülür
+    - Referans ve adayın toplam süreleri ile göreli hız raporlanır
+    """
+    def __init__(self, candidate_env_factory, reference_env_factory=None, candidate_agent_factory=None,
+                 reference_agent_factory=None, grid_sizes=(3, 4, 5, 6, 7), seed=0, compare_info=True,
+                 full_table_check_interval=10000):
+        self.reference_env_factory = reference_env_factory or (lambda grid_size: DroneDeliveryEnv(grid_size=grid_size))
+        self.candidate_env_factory = candidate_env_factory
+        self.reference_agent_factory = reference_agent_factory
+        self.candidate_agent_factory = candidate_agent_factory
+        self.grid_sizes = list(grid_sizes)
+        self.seed = seed
+        self.compare_info = compare_info # info sözlükleri (eylem/bitiş açıklamaları) de karşılaştırılsın mı?
+        self.full_table_check_interval = full_table_check_interval # Kaç adımda bir tüm Q-tabloları karşılaştırılacağı.
+        self.reference_seconds = 0.0
+        self.candidate_seconds = 0.0
+
+    def _timed(self, side, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        if side == "reference":
+            self.reference_seconds += elapsed
+        else:
+            self.candidate_seconds += elapsed
+        return result
+
+    def _paired(self, seed, ref_fn, cand_fn, *args):
+        # İki tarafı aynı tohumla kurulmuş global RNG'lerle çalıştırır; (ref sonucu, aday sonucu, RNG tüketimi aynı mı) döndürür.
+        # RNG tüketebilen çağrılar (ortam kurulumu/reset ve learn) içindir; step() doğrudan çağrılır.
+        _seed_global_rngs(seed)
+        ref_result = self._timed("reference", ref_fn, *args)
+        ref_digest = _rng_digest()
+        _seed_global_rngs(seed)
+        cand_result = self._timed("candidate", cand_fn, *args)
+        return ref_result, cand_result, ref_digest == _rng_digest()
+
+    @staticmethod
+    def _compare_step(ref, cand, compare_info):
+        # Bir step() sonucunu karşılaştırır; farklıysa açıklama döndürür.
+        ref_state, ref_reward, ref_done, ref_info = ref
+        cand_state, cand_reward, cand_done, cand_info = cand
+        if tuple(ref_state) != tuple(cand_state):
+            return f"durum farklı: {ref_state} != {cand_state}"
+        if ref_reward != cand_reward:
+            return f"ödül farklı: {ref_reward} != {cand_reward}"
+        if bool(ref_done) != bool(cand_done):
+            return f"bitti bayrağı farklı: {ref_done} != {cand_done}"
+        if compare_info and ref_info != cand_info:
+            return f"info farklı: {ref_info} != {cand_info}"
+        return None
+
+    def _replay(self, grid_size, reset_seed, actions):
+        # Aynı tohumla iki ortamı kurup eylemleri uygular; ilk farklılığın indeksini döndürür (yoksa None).
+        _seed_global_rngs(reset_seed)
+        ref_env = self.reference_env_factory(grid_size)
+        _seed_global_rngs(reset_seed)
+        cand_env = self.candidate_env_factory(grid_size)
+        if tuple(ref_env.get_state()) != tuple(cand_env.get_state()) or _env_snapshot(ref_env) != _env_snapshot(cand_env):
+            return -1
+        for i, action in enumerate(actions):
+            ref, cand = ref_env.step(action), cand_env.step(action)
+            if self._compare_step(ref, cand, self.compare_info) or _env_snapshot(ref_env) != _env_snapshot(cand_env):
+                return i
+        return None
+
+    def _replay_agents(self, grid_size, reset_seed, steps):
+        # steps: (eylem, learn tohumu) çiftleri. Ortamlar run() ile aynı tohumla kurulur, ajanlar referans
+        # geçişleriyle aynı tohumlu learn() çağrılarından geçirilir; ilk ajan farklılığının indeksini döndürür (yoksa None).
+        ref_env, cand_env, _ = self._paired(reset_seed, self.reference_env_factory, self.candidate_env_factory, grid_size)
+        ref_agent, cand_agent = self.reference_agent_factory(ref_env), self.candidate_agent_factory(cand_env)
+        state = ref_env.get_state()
+        for i, (action, learn_seed) in enumerate(steps):
+            next_state, reward, done, _ = ref_env.step(action)
+            _, _, same_rng = self._paired(learn_seed, ref_agent.learn, cand_agent.learn, state, action, reward, next_state, done)
+            if self._compare_agents(ref_agent, cand_agent, same_rng, (state, next_state), full=i == len(steps) - 1):
+                return i
+            if done: # Episode bitti; kalan adımlar run()'da hiç oynanmazdı.
+                return None
+            state = next_state
+        return None
+
+    @staticmethod
+    def _compare_agents(ref_agent, cand_agent, same_rng, keys, full=False):
+        # learn() sonrası iki ajanı karşılaştırır; farklıysa açıklama döndürür.
+        if not same_rng:
+            return "learn() RNG tüketimi farklı"
+        for key in keys:
+            if not np.array_equal(ref_agent.q_table.get(key), cand_agent.q_table.get(key)):
+                return f"Q satırı farklı {key}: {ref_agent.q_table.get(key)} != {cand_agent.q_table.get(key)}"
+        if full and (ref_agent.q_table.keys() != cand_agent.q_table.keys() or any(
+                not np.array_equal(row, cand_agent.q_table[key]) for key, row in ref_agent.q_table.items())):
+            return "Q-tabloları farklı (tam karşılaştırma)"
+        return None
+
+    @staticmethod
+    def _ddmin(items, reproduce):
+        # Delta debugging (ddmin) tarzı küçültme: önce büyük parçalar, sonra giderek küçülen parçalar silinir;
+        # en sonda tüm öğe çiftleri denenir. reproduce(deneme) farklılık korunuyorsa (kırpılmış) listeyi,
+        # korunmuyorsa None döndürür.
+        items = list(items)
+        n = 2
+        while len(items) >= 2:
+            chunk = -(-len(items) // n)
+            for start in range(0, len(items), chunk):
+                result = reproduce(items[:start] + items[start + chunk:])
+                if result is not None:
+                    items = result
+                    n = max(n - 1, 2)
+                    break
+            else:
+                if chunk == 1:
+                    break
+                n = min(len(items), 2 * n)
+        reduced = True
+        while reduced: # Tek silmenin bozduğu ama birlikte silinebilen çiftler (ör: kalk + in).
+            reduced = False
+            for i in range(len(items)):
+                for j in range(i + 1, len(items)):
+                    result = reproduce(items[:i] + items[i + 1:j] + items[j + 1:])
+                    if result is not None:
+                        items = result
+                        reduced = True
+                        break
+                if reduced:
+                    break
+        return items
+
+    def _minimize(self, grid_size, reset_seed, actions):
+        # Ortam farklılığını koruyarak eylem listesini küçültür; farklılık son eylemde kalacak şekilde kırpılır.
+        def reproduce(trial):
+            index = self._replay(grid_size, reset_seed, trial)
+            return trial[:index + 1] if index is not None and index >= 0 else None
+        return self._ddmin(actions, reproduce)
+
+    def _minimize_agent(self, grid_size, reset_seed, actions, learn_seeds):
+        # Ajan farklılığını (eylem, learn tohumu) çiftleri üzerinde küçültür; (eylemler, tohumlar) döndürür.
+        def reproduce(trial):
+            index = self._replay_agents(grid_size, reset_seed, trial)
+            return trial[:index + 1] if index is not None else None
+        steps = self._ddmin(list(zip(actions, learn_seeds)), reproduce)
+        return [action for action, _ in steps], [learn_seed for _, learn_seed in steps]
+
+    def run(self, total_steps=1_000_000):
+        # Toplam adım sayısına ulaşana veya ilk farklılığa kadar çalışır; rapor sözlüğü döndürür.
+        self.reference_seconds = self.candidate_seconds = 0.0
+        action_rng = random.Random(self.seed)
+        seed_rng = random.Random(self.seed + 1) # reset/learn çağrıları için tohum akışı.
+        steps = episodes = 0
+        divergence = None
+        grid_index = 0
+        while steps < total_steps and divergence is None:
+            grid_size = self.grid_sizes[grid_index % len(self.grid_sizes)]
+            grid_index += 1
+            reset_seed = seed_rng.getrandbits(32)
+            ref_env, cand_env, same_rng = self._paired(reset_seed, self.reference_env_factory, self.candidate_env_factory, grid_size)
+            ref_agent = cand_agent = None
+            if self.reference_agent_factory and self.candidate_agent_factory:
+                ref_agent, cand_agent = self.reference_agent_factory(ref_env), self.candidate_agent_factory(cand_env)
+            actions = []
+            learn_seeds = [] # Adım başına learn() tohumları (ajan farklılığını yeniden oynatmak için).
+            state = ref_env.get_state()
+            if not same_rng or tuple(state) != tuple(cand_env.get_state()) or _env_snapshot(ref_env) != _env_snapshot(cand_env):
+                # Ortam kurulumu (reset) RNG tüketir; burada RNG tüketimi de karşılaştırılır.
+                divergence = {"kind": "reset", "grid_size": grid_size, "step": steps, "actions": [],
+                              "detail": f"başlangıç durumu farklı: {state} != {cand_env.get_state()}", "reset_seed": reset_seed}
+                break
+            done = False
+            ref_step, cand_step = ref_env.step, cand_env.step
+            perf_counter = time.perf_counter
+            while not done and steps < total_steps:
+                action = action_rng.randrange(6)
+                actions.append(action)
+                # step() RNG kullanmaz; süre ölçümü ve çağrı doğrudan yapılır (ek yük düşük tutulur).
+                start = perf_counter()
+                ref = ref_step(action)
+                middle = perf_counter()
+                cand = cand_step(action)
+                self.reference_seconds += middle - start
+                self.candidate_seconds += perf_counter() - middle
+                steps += 1
+                detail = self._compare_step(ref, cand, self.compare_info)
+                if detail is None:
+                    ref_snapshot, cand_snapshot = _env_snapshot(ref_env), _env_snapshot(cand_env)
+                    if ref_snapshot != cand_snapshot:
+                        detail = f"iç durum farklı: {ref_snapshot} != {cand_snapshot}"
+                if detail:
+                    divergence = {"kind": "env", "grid_size": grid_size, "step": steps, "detail": detail,
+                                  "reset_seed": reset_seed, "actions": self._minimize(grid_size, reset_seed, actions)}
+                    break
+                next_state, reward, done, _ = ref
+                if ref_agent is not None:
+                    learn_seeds.append(seed_rng.getrandbits(32))
+                    _, _, same_rng = self._paired(learn_seeds[-1], ref_agent.learn, cand_agent.learn, state, action, reward, next_state, done)
+                    detail = self._compare_agents(ref_agent, cand_agent, same_rng, (state, next_state),
+                                                  full=steps % self.full_table_check_interval == 0)
+                    if detail:
+                        min_actions, min_seeds = self._minimize_agent(grid_size, reset_seed, actions, learn_seeds)
+                        divergence = {"kind": "agent", "grid_size": grid_size, "step": steps, "detail": detail,
+                                      "reset_seed": reset_seed, "actions": min_actions, "learn_seeds": min_seeds,
+                                      "transition": (state, action, reward, next_state, done)}
+                        break
+                state = next_state
+            episodes += 1
+        return {
+            "steps": steps,
+            "episodes": episodes,
+            "divergence": divergence,
+            "reference_seconds": self.reference_seconds,
+            "candidate_seconds": self.candidate_seconds,
+            "speedup": self.reference_seconds / self.candidate_seconds if self.candidate_seconds else 0.0,
+        }
+
+# =====================
+# Başsız (Headless) NumPy Rasterlayıcı ve Kare Dışa Aktarma
+# =====================
+RASTER_COLORS = {
+    'background': (255, 255, 255),
+    'grid': (192, 192, 192),
+    'drone': (0, 0, 255),
+    'drone_landed': (100, 100, 180), # İniş yapmış drone rengi.
+    'cargo_depot': (0, 255, 0), # Kargo deposu rengi.
+    'delivery_point': (255, 0, 0), # Teslimat noktası rengi.
+    'cargo': (0, 255, 0), # Kargo rengi.
+    'shadow': (195, 195, 195), # Gölge (beyaz zemin üzerinde yarı saydam griye denk).
+    'propeller': (0, 0, 0),
+    'text': (0, 0, 0),
+    'battery_empty': (220, 220, 220),
+    'battery_full': (40, 170, 40),
+    'battery_low': (220, 60, 40),
+}
+
+# 3x5 piksel rakam yazı tipi (teslimat numaraları için).
+DIGIT_GLYPHS = {
+    "0": ("111", "101", "101", "101", "111"), "1": ("010", "110", "010", "010", "111"),
+    "2": ("111", "001", "111", "100", "111"), "3": ("111", "001", "111", "001", "111"),
+    "4": ("101", "101", "111", "001", "001"), "5": ("111", "100", "111", "001", "111"),
+    "6": ("111", "100", "111", "101", "111"), "7": ("111", "001", "001", "001", "001"),
+    "8": ("111", "101", "111", "101", "111"), "9": ("111", "101", "111", "001", "111"),
+}
+
+def _disc_mask(width, height=None):
+    # width x height boyutlu elips maskesi (QPainter.drawEllipse karşılığı).
+    height = width if height is None else height
+    ys, xs = np.ogrid[:max(height, 1), :max(width, 1)]
+    cy, cx = (height - 1) / 2.0, (width - 1) / 2.0
+    ry, rx = max(height / 2.0, 0.5), max(width / 2.0, 0.5)
+    return ((ys - cy) / ry) ** 2 + ((xs - cx) / rx) ** 2 <= 1.0
+
+def _blit(frame, mask, x, y, color):
+    # Maskeyi (x, y) sol üst köşesine, kare sınırlarına kırparak renkle basar.
+    h, w = mask.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    frame[y0:y1, x0:x1][mask[y0 - y:y1 - y, x0 - x:x1 - x]] = color
+
+class FrameRasterizer:
+    """
+    Ortamı Qt olmadan, önceden ayrılmış NumPy RGB kare tamponlarına çizer:
+    - Arka plan, grid çizgileri, depo ve teslim edilmemiş noktalar statik katmanda önbelleğe alınır
+    - Her karede statik katman kopyalanır, yalnızca drone/gölge/pervane/kargo/batarya sprite'ları basılır
+    - Sprite maskeleri hücre boyutuna göre bir kez hesaplanır
+    """
+    def __init__(self, grid_size, cell_size=60, margin=None):
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self.margin = cell_size // 2 if margin is None else margin # Uçuş yüksekliği ve batarya çubuğu için kenar boşluğu.
+        size = grid_size * cell_size + 2 * self.margin
+        self.shape = (size, size, 3)
+        self.frame = np.empty(self.shape, dtype=np.uint8) # Yeniden kullanılan kare tamponu.
+        self.static_cache = OrderedDict() # (depo, noktalar, teslim durumu) -> statik katman
+        self.static_cache_size = 64
+        c = cell_size
+        self.depot_mask = _disc_mask(2 * c // 3)
+        self.point_mask = _disc_mask(c // 2)
+        self.body_mask = _disc_mask(c // 2)
+        self.shadow_mask = _disc_mask(c // 3, c // 8)
+        self.propeller_masks = {False: _disc_mask(c // 8), True: _disc_mask(c // 6)}
+        self.cargo_mask = np.ones((c // 4, c // 4), dtype=bool)
+        self.glyph_scale = max(1, c // 30)
+        self.glyph_masks = {d: np.repeat(np.repeat(np.array([[ch == "1" for ch in row] for row in rows]), self.glyph_scale, 0), self.glyph_scale, 1)
+                            for d, rows in DIGIT_GLYPHS.items()}
+
+    def _cell_center(self, pos):
+        # Hücre merkezinin piksel koordinatı (x, y); GridWidget ile aynı eksen düzeni.
+        return (self.margin + int(pos[1]) * self.cell_size + self.cell_size // 2,
+                self.margin + int(pos[0]) * self.cell_size + self.cell_size // 2)
+
+    def _draw_text(self, frame, text, x, y, color):
+        # Rakam dizisini (x, y) merkezli olarak çizer.
+        width = len(text) * 4 * self.glyph_scale - self.glyph_scale
+        x -= width // 2
+        y -= 5 * self.glyph_scale // 2
+        for ch in text:
+            _blit(frame, self.glyph_masks[ch], x, y, color)
+            x += 4 * self.glyph_scale
+
+    def static_layer(self, env):
+        # Sahneye bağlı statik katmanı önbellekten döndürür (yoksa çizer).
+        key = (tuple(np.asarray(env.cargo_depot_pos).tolist()),
+               tuple(tuple(np.asarray(p).tolist()) for p in env.delivery_points), tuple(env.delivered))
+        layer = self.static_cache.get(key)
+        if layer is not None:
+            self.static_cache.move_to_end(key)
+            return layer
+        layer = np.empty(self.shape, dtype=np.uint8)
+        layer[:] = RASTER_COLORS['background']
+        m, c, n = self.margin, self.cell_size, self.grid_size
+        for i in range(n + 1): # Grid çizgileri
+            layer[m + i * c, m:m + n * c + 1] = RASTER_COLORS['grid']
+            layer[m:m + n * c + 1, m + i * c] = RASTER_COLORS['grid']
+        x, y = self._cell_center(env.cargo_depot_pos)
+        _blit(layer, self.depot_mask, x - c // 3, y - c // 3, RASTER_COLORS['cargo_depot'])
+        for i, point in enumerate(env.delivery_points):
+            if i < len(env.delivered) and not env.delivered[i]: # Henüz teslim edilmemişse çiz.
+                x, y = self._cell_center(point)
+                _blit(layer, self.point_mask, x - c // 4, y - c // 4, RASTER_COLORS['delivery_point'])
+                self._draw_text(layer, str(i + 1), x, y, RASTER_COLORS['text'])
+        self.static_cache[key] = layer
+        if len(self.static_cache) > self.static_cache_size:
+            self.static_cache.popitem(last=False)
+        return layer
+
+    def render(self, env, out=None):
+        # Ortamın anlık görüntüsünü out (veya iç tampon) içine çizer ve döndürür.
+        frame = self.frame if out is None else out
+        np.copyto(frame, self.static_layer(env))
+        c = self.cell_size
+        x, y = self._cell_center(env.drone_pos)
+        if env.is_flying: # Drone uçuyorsa gölge ve yükseklik ofseti
+            _blit(frame, self.shadow_mask, x - c // 6, y + c // 4, RASTER_COLORS['shadow'])
+            if env.landing_state == "taking_off":
+                y += -5 * env.landing_animation_step
+            elif env.landing_state == "landing":
+                y += -15 + 5 * env.landing_animation_step
+            elif env.landing_state == "flying":
+                y += -15
+        _blit(frame, self.body_mask, x - c // 4, y - c // 4, RASTER_COLORS['drone' if env.is_flying else 'drone_landed'])
+        propeller = self.propeller_masks[bool(env.is_flying)]
+        p = propeller.shape[0]
+        for dx in (-p, p): # Pervaneler
+            for dy in (-p, p):
+                _blit(frame, propeller, x + dx - p // 2, y + dy - p // 2, RASTER_COLORS['propeller'])
+        if env.has_cargo: # Kargo çizimi
+            _blit(frame, self.cargo_mask, x - c // 8, y - c // 8, RASTER_COLORS['cargo'])
+        # Batarya çubuğu (metin yerine doluluk oranı)
+        bar_w, bar_h = c // 2, max(3, c // 12)
+        bx, by = x - bar_w // 2, y - c // 4 - bar_h - 3
+        filled = int(round(bar_w * max(0, min(env.battery, 100)) / 100))
+        y0, y1, x0 = max(by, 0), max(by + bar_h, 0), max(bx, 0)
+        frame[y0:y1, x0:bx + bar_w] = RASTER_COLORS['battery_empty']
+        frame[y0:y1, x0:max(bx + filled, 0)] = RASTER_COLORS['battery_full' if env.battery > 20 else 'battery_low']
+        return frame
+
+def write_ppm(path, frame):
+    # Kareyi ikili PPM (P6) olarak yazar.
+    with open(path, "wb") as f:
+        f.write(b"P6 %d %d 255\n" % (frame.shape[1], frame.shape[0]))
+        f.write(np.ascontiguousarray(frame).tobytes())
+
+def _png_chunk(tag, data):
+    return struct.pack("!I", len(data)) + tag + data + struct.pack("!I", zlib.crc32(tag + data) & 0xffffffff)
+
+def _png_image_data(frame, level):
+    # Her satırın başına filtre baytı (0) ekleyip zlib ile sıkıştırır.
+    h, w = frame.shape[:2]
+    raw = np.zeros((h, w * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = frame.reshape(h, w * 3)
+    return zlib.compress(raw.tobytes(), level)
+
+def _png_header(frame):
+    return b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", struct.pack("!IIBBBBB", frame.shape[1], frame.shape[0], 8, 2, 0, 0, 0))
+
+def write_png(path, frame, level=1):
+    # Kareyi yalnızca zlib kullanarak RGB PNG olarak yazar.
+    with open(path, "wb") as f:
+        f.write(_png_header(frame) + _png_chunk(b"IDAT", _png_image_data(frame, level)) + _png_chunk(b"IEND", b""))
+
+def write_apng(path, frames, fps=10, level=1):
+    # Kareleri animasyonlu PNG (APNG) olarak yazar; tarayıcılar ve çoğu görüntüleyici oynatır.
+    frames = list(frames)
+    if not frames:
+        raise ValueError("APNG için en az bir kare gerekli")
+    h, w = frames[0].shape[:2]
+    sequence = 0
+    with open(path, "wb") as f:
+        f.write(_png_header(frames[0]) + _png_chunk(b"acTL", struct.pack("!II", len(frames), 0)))
+        for i, frame in enumerate(frames):
+            f.write(_png_chunk(b"fcTL", struct.pack("!IIIIIHHBB", sequence, w, h, 0, 0, 1, fps, 0, 0)))
+            sequence += 1
+            data = _png_image_data(frame, level)
+            if i == 0:
+                f.write(_png_chunk(b"IDAT", data))
+            else:
+                f.write(_png_chunk(b"fdAT", struct.pack("!I", sequence) + data))
+                sequence += 1
+        f.write(_png_chunk(b"IEND", b""))
+
+def export_episodes(env, agent, out_dir, episodes=1, fmt="apng", cell_size=40, fps=10, max_frames=None):
+    # Greedy politikayla episode'ları oynatıp kareleri dışa aktarır (ekran/Qt gerektirmez).
+    # fmt: "apng" (episode başına bir animasyon), "png" veya "ppm" (kare dizisi). Yazılan dosya yollarını döndürür.
+    if fmt not in ("apng", "png", "ppm"):
+        raise ValueError(f"Desteklenmeyen format: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+    rasterizer = FrameRasterizer(env.grid_size, cell_size)
+    max_frames = max_frames or env.max_steps + 1
+    buffer = np.empty((max_frames,) + rasterizer.shape, dtype=np.uint8) # Episode kareleri için önceden ayrılmış tampon.
+    paths = []
+    for episode in range(episodes):
+        state = env.reset()
+        count = 0
+        rasterizer.render(env, buffer[count]); count += 1
+        done = False
+        while not done and count < max_frames:
+            state, _, done, _ = env.step(agent.select_action(state, training=False))
+            rasterizer.render(env, buffer[count]); count += 1
+        if fmt == "apng":
+            path = os.path.join(out_dir, f"episode_{episode:04d}.png")
+            write_apng(path, buffer[:count], fps=fps)
+            paths.append(path)
+            continue
+        writer = write_png if fmt == "png" else write_ppm
+        for i in range(count):
+            path = os.path.join(out_dir, f"episode_{episode:04d}_{i:04d}.{fmt}")
+            writer(path, buffer[i])
+            paths.append(path)
+    return paths
 
 # =====================
 # Eğitim Thread'i (PyQt5)
@@ -376,7 +2561,7 @@ class TrainingThread(QThread): # PyQt5 QThread sınıfından miras alır, böyle
     progress = pyqtSignal(int, float, float, float)  # episode, reward, steps, epsilon -> Eğitim ilerlemesini bildiren sinyal.
     finished = pyqtSignal(list, list) # Eğitim bittiğinde ödül ve adım listelerini gönderen sinyal.
     state_update = pyqtSignal() # Ortam durumunun güncellenmesi gerektiğini bildiren sinyal (görsel arayüz için).
-    def __init__(self, env, agent, episodes, update_interval=10, mode="fast", delay=0.1): # "ansi" -> "fast"
+    def __init__(self, env, agent, episodes, update_interval=10, mode="fast", delay=0.1, checkpoint_manager=None, start_episode=0, profiler=None, convergence_monitor=None): # "ansi" -> "fast"
         super().__init__()
         self.env = env # Eğitim ortamı.
         self.agent = agent # Eğitilecek ajan.
@@ -385,11 +2570,29 @@ class TrainingThread(QThread): # PyQt5 QThread sınıfından miras alır, böyle
         self.update_interval = update_interval # fast modunda ne sıklıkta arayüzün güncelleneceği.
         self.mode = mode  # 'human' (canlı izleme) veya 'fast' (hızlı eğitim).
         self.delay = delay  # 'human' modunda adımlar arası gecikme (saniye).
+        self.checkpoint_manager = checkpoint_manager # Opsiyonel artımlı checkpoint yöneticisi.
+        self.start_episode = start_episode # Checkpoint'ten devam ederken başlangıç episode'u.
+        self.profiler = profiler # Opsiyonel TrainingProfiler (None: ölçüm yok).
+        self.convergence_monitor = convergence_monitor # Opsiyonel ConvergenceMonitor (yakınsayınca erken durdurma).
+        self.stopped_early = False # Eğitim yakınsama nedeniyle erken durduruldu mu?
     def run(self):
+        # Profiler verildiyse eğitim döngüsünü enstrümante ederek çalıştırır.
+        if self.profiler is None:
+            self._run_training()
+            return
+        self.profiler.attach(self)
+        self.profiler.start()
+        try:
+            self._run_training()
+        finally:
+            self.profiler.stop()
+            self.profiler.detach()
+    def _run_training(self):
         # Eğitim döngüsü (her episode için)
         rewards_per_episode = [] # Her bölümdeki toplam ödülü saklar.
         steps_per_episode = [] # Her bölümdeki adım sayısını saklar.
-        for episode in range(self.episodes):
+        completed_episodes = self.start_episode # Tamamen bitirilen episode sayısı (checkpoint için).
+        for episode in range(self.start_episode, self.episodes):
             if not self.running: # Eğer durdurma sinyali geldiyse eğitimi sonlandır.
                 break
             state = self.env.reset() # Ortamı sıfırla.
@@ -411,9 +2614,21 @@ class TrainingThread(QThread): # PyQt5 QThread sınıfından miras alır, böyle
                     self.state_update.emit() # Arayüzü güncelle.
             rewards_per_episode.append(total_reward) # Bölüm ödülünü listeye ekle.
             steps_per_episode.append(self.env.steps) # Bölüm adım sayısını listeye ekle.
-            self.agent.decay_epsilon() # Epsilon değerini azalt.
+            if done:
+                self.agent.decay_epsilon() # Epsilon değerini azalt (yarım kalan episode devamda tekrar oynanır).
+                completed_episodes = episode + 1
+                if self.checkpoint_manager: # Periyodik checkpoint (yazma işlemi arka planda).
+                    self.checkpoint_manager.maybe_checkpoint(self.agent, completed_episodes)
+                if self.convergence_monitor and self.convergence_monitor.episode_finished(self.agent, self.env.steps):
+                    self.stopped_early = True # Yakınsama kriterleri sağlandı, kalan episode'lar atlanır.
+                    self.running = False
             self.state_update.emit() # Arayüzü güncelle.
             self.progress.emit(episode+1, total_reward, self.env.steps, self.agent.epsilon) # İlerleme sinyalini gönder.
+            if self.profiler:
+                self.profiler.episode_finished(episode+1)
+        if self.checkpoint_manager: # Durdurulsa da bitse de son durumu kaydet.
+            self.checkpoint_manager.checkpoint(self.agent, completed_episodes)
+            self.checkpoint_manager.flush()
         self.finished.emit(rewards_per_episode, steps_per_episode) # Eğitim bitti sinyalini gönder.
     def stop(self):
         # Eğitimi durdurmak için kullanılır.
@@ -423,9 +2638,16 @@ class TrainingThread(QThread): # PyQt5 QThread sınıfından miras alır, böyle
 # Grid ve Bilgi Paneli (PyQt5)
 # =====================
 class GridWidget(QWidget): # Ortamın grid yapısını görselleştiren widget.
-    def __init__(self, env, parent=None):
+    OVERLAY_ARROWS = {0: "↓", 1: "→", 2: "↑", 3: "←", 4: "📦", 5: "⇅"} # Greedy eylem işaretleri.
+    def __init__(self, env, parent=None, agent=None):
         super().__init__(parent)
         self.env = env # Görselleştirilecek ortam.
+        self.agent = agent # Değer/politika katmanı için Q-tablosu sahibi ajan.
+        self.show_overlay = False # V(s)=max Q ısı haritası ve greedy eylem okları gösterilsin mi?
+        self.overlay_interval = 0.5 # Eğitim sırasında katmanın en fazla kaç saniyede bir yeniden hesaplanacağı.
+        self._overlay_cache = None # (anahtar, pixmap) önbelleği.
+        self._overlay_time = 0.0 # Son hesaplama zamanı.
+        self.training_active = False # Eğitim sürerken bağlam değişiklikleri de overlay_interval ile sınırlandırılır.
         self.cell_size = 80 # Her bir grid hücresinin piksel boyutu.
         self.setMinimumSize(env.grid_size * self.cell_size, env.grid_size * self.cell_size)
         # Renkler ve görsel ayarlar
@@ -439,6 +2661,68 @@ class GridWidget(QWidget): # Ortamın grid yapısını görselleştiren widget.
             'cargo': Qt.green, # Kargo rengi.
             'shadow': QColor(100, 100, 100, 80) # Drone uçarkenki gölge rengi.
         }
+    def compute_overlay(self, context):
+        # Mevcut bağlam (kargo/uçuş/teslimat/batarya/indeksler) için tüm hücrelerin Q-satırlarını
+        # tek geçişte toplayıp V(s)=max Q ve greedy eylemleri NumPy ile hesaplar.
+        # Dönüş: (değerler (G, G), eylemler (G, G), tabloda var mı maskesi (G, G)).
+        size = self.env.grid_size
+        q_table = self.agent.q_table
+        rows = np.zeros((size * size, self.env.action_space_n))
+        known = np.zeros(size * size, dtype=bool)
+        for cell in range(size * size):
+            row = q_table.get((cell // size, cell % size) + context)
+            if row is not None:
+                rows[cell] = row
+                known[cell] = True
+        values = rows.max(axis=1)
+        actions = rows.argmax(axis=1)
+        return values.reshape(size, size), actions.reshape(size, size), known.reshape(size, size)
+
+    def _render_overlay(self, context):
+        # Isı haritasını ve okları grid boyutunda önbelleğe alınacak bir pixmap'e çizer.
+        size = self.env.grid_size
+        values, actions, known = self.compute_overlay(context)
+        rgba = np.zeros((size, size, 4), dtype=np.uint8)
+        if known.any():
+            low, high = values[known].min(), values[known].max()
+            scale = (values - low) / (high - low) if high > low else np.full(values.shape, 0.5)
+            rgba[..., 0] = (255 * (1 - scale)).astype(np.uint8) # Düşük değer: kırmızı
+            rgba[..., 1] = (200 * scale).astype(np.uint8) # Yüksek değer: yeşil
+            rgba[..., 3] = np.where(known, 110, 0)
+        image = QImage(rgba.tobytes(), size, size, size * 4, QImage.Format_RGBA8888).copy()
+        pixmap = QPixmap(size * self.cell_size, size * self.cell_size)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.drawImage(QRect(0, 0, size * self.cell_size, size * self.cell_size), image) # Hücre başına bir piksel, yumuşatmadan büyütülür.
+        painter.setPen(QColor(40, 40, 40))
+        painter.setFont(QFont('Arial', max(8, self.cell_size // 6)))
+        for x, y in zip(*np.nonzero(known)):
+            painter.drawText(QRect(y * self.cell_size, x * self.cell_size, self.cell_size // 3, self.cell_size // 3),
+                             Qt.AlignCenter, self.OVERLAY_ARROWS[int(actions[x, y])])
+        painter.end()
+        return pixmap
+
+    def overlay_pixmap(self):
+        # Önbellekteki katmanı döndürür. Tablo değişince en fazla overlay_interval saniyede bir yeniden hesaplanır.
+        # Bağlam (batarya, kargo, uçuş, teslimatlar) eğitim dışında değişince hemen; eğitim sırasında neredeyse
+        # her adımda değiştiği için yine overlay_interval ile sınırlı olarak yeniden hesaplanır.
+        if self.agent is None:
+            return None
+        context = self.env.get_state()[2:]
+        table_version = (id(self.agent.q_table), len(self.agent.q_table), self.agent.step_counter, self.agent.planning_updates)
+        key = (self.env.grid_size, self.cell_size, context)
+        if self._overlay_cache is not None:
+            cached_key, cached_version, pixmap = self._overlay_cache
+            throttled = time.monotonic() - self._overlay_time < self.overlay_interval
+            if cached_key == key and (cached_version == table_version or throttled):
+                return pixmap
+            if cached_key[:2] == key[:2] and throttled and self.training_active: # Aynı grid/hücre boyutu.
+                return pixmap
+        pixmap = self._render_overlay(context)
+        self._overlay_cache = (key, table_version, pixmap)
+        self._overlay_time = time.monotonic()
+        return pixmap
+
     def paintEvent(self, event):
         # Grid ve tüm nesneleri çiz
         # Bu fonksiyon, widget her yeniden çizildiğinde çağrılır.
@@ -449,6 +2733,11 @@ class GridWidget(QWidget): # Ortamın grid yapısını görselleştiren widget.
         grid_pixel_size = self.env.grid_size * self.cell_size
         x_offset = (self.width() - grid_pixel_size) // 2
         y_offset = (self.height() - grid_pixel_size) // 2
+        # Değer/politika katmanı (önbellekten)
+        if self.show_overlay:
+            overlay = self.overlay_pixmap()
+            if overlay is not None:
+                painter.drawPixmap(x_offset, y_offset, overlay)
         # Grid çizgileri
         painter.setPen(QPen(self.colors['grid'], 1))
         for i in range(self.env.grid_size + 1):
@@ -616,6 +2905,10 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.env = DroneDeliveryEnv(grid_size=self.grid_size) # Ortamı oluştur.
         self.agent = QLearningAgent(self.env) # Ajanı oluştur.
         self.training_thread = None # Eğitim thread'i başlangıçta yok.
+        self.checkpoint_dir = "checkpoints" # Artımlı checkpoint dizini.
+        self.checkpoint_manager = None # Aktif eğitimin checkpoint yöneticisi.
+        self.training_profiler = None # Aktif eğitimin profiler'ı (opsiyonel).
+        self.model_registry = ModelRegistry("models") # Kayıtlı modellerin metadata indeksi.
         self.sim_speed = 50  # AI ile oyna hız (ms).
         # --- Ana Layout ---
         central_widget = QWidget()
@@ -633,6 +2926,11 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.grid_size_spin.setValue(self.grid_size)
         self.grid_size_spin.valueChanged.connect(self.update_grid_size) # Değer değiştiğinde fonksiyon çağır.
         grid_layout.addWidget(self.grid_size_spin)
+        self.transfer_check = QCheckBox("Q-Tablosunu Aktar") # Grid boyutu değişince öğrenilmiş tabloyu yeni boyuta aktar.
+        grid_layout.addWidget(self.transfer_check)
+        self.overlay_check = QCheckBox("Değer/Politika Katmanı") # V(s) ısı haritası ve greedy eylem okları.
+        self.overlay_check.toggled.connect(self.update_overlay)
+        grid_layout.addWidget(self.overlay_check)
         grid_group.setLayout(grid_layout)
         left_layout.addWidget(grid_group)
         # Q-Learning parametreleri
@@ -656,6 +2954,12 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         ql_layout.addWidget(QLabel("Eğitim Episodes:"), 5, 0)
         self.episodes_spin = QSpinBox(); self.episodes_spin.setRange(100, 100000); self.episodes_spin.setSingleStep(100); self.episodes_spin.setValue(5000) # Eğitim bölümü sayısı.
         ql_layout.addWidget(self.episodes_spin, 5, 1)
+        ql_layout.addWidget(QLabel("Planlama Adımı (Dyna-Q):"), 6, 0)
+        self.planning_spin = QSpinBox(); self.planning_spin.setRange(0, 100); self.planning_spin.setValue(self.agent.planning_steps) # Gerçek adım başına planlama güncellemesi (0: kapalı).
+        ql_layout.addWidget(self.planning_spin, 6, 1)
+        ql_layout.addWidget(QLabel("Q-Değer Tipi:"), 7, 0)
+        self.dtype_combo = QComboBox(); self.dtype_combo.addItems(["float64", "float32"]) # float32 Q-tablosu belleğini yarıya indirir.
+        ql_layout.addWidget(self.dtype_combo, 7, 1)
         ql_group.setLayout(ql_layout)
         left_layout.addWidget(ql_group)
         # Eğitim hızı (mod ve delay)
@@ -689,10 +2993,20 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.stop_button = QPushButton("⏹️ Eğitimi Durdur"); self.stop_button.clicked.connect(self.stop_training); self.stop_button.setEnabled(False) # Eğitimi durdur butonu (başlangıçta pasif).
         self.save_button = QPushButton("💾 Modeli Kaydet"); self.save_button.clicked.connect(self.save_model); self.save_button.setEnabled(False) # Modeli kaydet butonu (başlangıçta pasif).
         self.load_button = QPushButton("📂 Modeli Yükle"); self.load_button.clicked.connect(self.load_model) # Modeli yükle butonu.
+        self.auto_load_button = QPushButton("📚 Uygun Modeli Yükle"); self.auto_load_button.clicked.connect(self.load_matching_model) # Grid boyutuna uygun kayıtlı modeli yükle.
+        self.checkpoint_check = QCheckBox("Otomatik Checkpoint"); self.checkpoint_check.setChecked(True) # Eğitim sırasında arka planda checkpoint al.
+        self.profile_check = QCheckBox("⏱️ Profil Ölçümü") # Eğitim fazlarının süre/sayaç raporu (opsiyonel).
+        self.early_stop_check = QCheckBox("Yakınsayınca Otomatik Durdur") # Q-tablosu değişmeyi bırakınca eğitimi bitir.
+        self.resume_button = QPushButton("⏯️ Checkpoint'ten Devam Et"); self.resume_button.clicked.connect(self.resume_training) # Son checkpoint'ten eğitime devam et.
         training_layout.addWidget(self.train_button)
         training_layout.addWidget(self.stop_button)
         training_layout.addWidget(self.save_button)
         training_layout.addWidget(self.load_button)
+        training_layout.addWidget(self.auto_load_button)
+        training_layout.addWidget(self.checkpoint_check)
+        training_layout.addWidget(self.profile_check)
+        training_layout.addWidget(self.early_stop_check)
+        training_layout.addWidget(self.resume_button)
         training_group.setLayout(training_layout)
         left_layout.addWidget(training_group)
         # Oyun kontrolleri
@@ -712,7 +3026,7 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         # --- Sağ Panel: Grid ve Bilgi Paneli ---
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel) # Sağ panel layout'u (dikey).
-        self.grid_widget = GridWidget(self.env) # Grid widget'ını oluştur.
+        self.grid_widget = GridWidget(self.env, agent=self.agent) # Grid widget'ını oluştur.
         self.info_panel = InfoPanelWidget(self.env) # Bilgi paneli widget'ını oluştur.
         right_layout.addWidget(self.grid_widget, 7) # Grid widget'ını ekle (daha fazla yer kaplasın).
         right_layout.addWidget(self.info_panel, 3) # Bilgi panelini ekle.
@@ -735,13 +3049,19 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
     def set_params_enabled(self, enabled: bool):
         # Q-Learning ve grid parametrelerinin aktif/pasif durumunu ayarlar.
         self.grid_size_spin.setEnabled(enabled)
+        self.transfer_check.setEnabled(enabled)
         self.alpha_spin.setEnabled(enabled)
         self.gamma_spin.setEnabled(enabled)
         self.epsilon_spin.setEnabled(enabled)
         self.epsilon_decay_spin.setEnabled(enabled)
         self.min_epsilon_spin.setEnabled(enabled)
         self.episodes_spin.setEnabled(enabled)
+        self.planning_spin.setEnabled(enabled)
+        self.dtype_combo.setEnabled(enabled)
         self.training_mode_combo.setEnabled(enabled)
+        self.checkpoint_check.setEnabled(enabled)
+        self.profile_check.setEnabled(enabled)
+        self.early_stop_check.setEnabled(enabled)
         self.training_speed_slider.setEnabled(enabled)
         self.sim_speed_slider.setEnabled(enabled)
 
@@ -753,11 +3073,25 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.reset_button.setEnabled(enabled)
         self.save_button.setEnabled(enabled and self.model_trained) # Kaydet butonu model eğitildiyse aktif olur.
         self.load_button.setEnabled(enabled)
+        self.auto_load_button.setEnabled(enabled)
+        self.resume_button.setEnabled(enabled)
 
     def update_grid_size(self):
         # Grid boyutu değiştiğinde çağrılır.
+        old_agent = self.agent
+        old_size = self.grid_size
         self.grid_size = self.grid_size_spin.value()
         self.reset_env() # Ortamı yeni grid boyutuyla sıfırla.
+        if self.transfer_check.isChecked() and old_agent.q_table: # Öğrenilmiş tabloyu yeni grid boyutuna aktar.
+            self.agent.set_q_table(transfer_q_table(old_agent.q_table, old_size, self.grid_size))
+            if self.agent.q_table:
+                self.model_trained = True
+                self.set_game_buttons_enabled(True)
+                self.statusBar().showMessage(f"Q-tablosu {old_size}x{old_size} -> {self.grid_size}x{self.grid_size} aktarıldı ({len(self.agent.q_table)} durum)")
+    def update_overlay(self, checked):
+        # Değer/politika katmanını açar veya kapatır.
+        self.grid_widget.show_overlay = checked
+        self.grid_widget.update()
     def update_sim_speed(self):
         # Simülasyon hızı (AI ile oynama hızı) değiştiğinde çağrılır.
         self.sim_speed = self.sim_speed_slider.value()
@@ -770,6 +3104,7 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.env = DroneDeliveryEnv(grid_size=self.grid_size) # Yeni ortam oluştur.
         self.agent = QLearningAgent(self.env) # Yeni ajan oluştur (Q-tablosu sıfırlanır).
         self.grid_widget.env = self.env # Grid widget'ının ortamını güncelle.
+        self.grid_widget.agent = self.agent # Değer katmanı yeni ajanın tablosunu kullanır.
         self.info_panel.env = self.env # Bilgi panelinin ortamını güncelle.
         self.model_trained = False # Model eğitilmedi olarak işaretle.
         self.model_loaded = False # Model yüklenmedi olarak işaretle.
@@ -819,7 +3154,13 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.agent.epsilon = self.epsilon_spin.value()
         self.agent.epsilon_decay = self.epsilon_decay_spin.value()
         self.agent.min_epsilon = self.min_epsilon_spin.value()
+        self.agent.planning_steps = self.planning_spin.value()
+        self.agent.set_dtype(self.dtype_combo.currentText())
         episodes = self.episodes_spin.value() # Eğitim bölümü sayısını al.
+        self.launch_training(episodes)
+
+    def launch_training(self, episodes, start_episode=0, checkpoint_manager=None):
+        # Eğitim thread'ini mevcut ajanla başlatır (yeni eğitim veya checkpoint'ten devam).
         mode_text = self.training_mode_combo.currentText() # Seçilen eğitim modunu al.
         training_mode = "human" if "human" in mode_text.lower() else "ansi" # Eğitim modunu belirle.
         delay = self.training_speed_slider.value() / 1000.0 if hasattr(self, 'training_speed_slider') else 0.1 # Canlı mod için gecikme.
@@ -832,16 +3173,45 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.set_game_buttons_enabled(False)
         self.set_params_enabled(False)
         # ---
-        self.env.reset() # Ortamı sıfırla.
+        if start_episode == 0: # Devam ederken RNG durumu checkpoint'teki gibi kalmalı.
+            self.env.reset() # Ortamı sıfırla.
         self.training_rewards = []; self.training_steps = [] # Ödül ve adım listelerini sıfırla.
         # Eğitim thread'ini oluştur ve başlat.
-        self.training_thread = TrainingThread(self.env, self.agent, episodes, mode=training_mode, delay=delay)
+        if checkpoint_manager is None and self.checkpoint_check.isChecked():
+            checkpoint_manager = CheckpointManager(self.checkpoint_dir, fresh=start_episode == 0)
+        self.checkpoint_manager = checkpoint_manager
+        self.training_profiler = TrainingProfiler(report_callback=None) if self.profile_check.isChecked() else None
+        self.training_thread = TrainingThread(self.env, self.agent, episodes, mode=training_mode, delay=delay,
+                                              checkpoint_manager=checkpoint_manager, start_episode=start_episode,
+                                              profiler=self.training_profiler,
+                                              convergence_monitor=ConvergenceMonitor() if self.early_stop_check.isChecked() else None)
         self.training_thread.progress.connect(self.update_training_progress) # İlerleme sinyaline bağlan.
         self.training_thread.finished.connect(self.training_finished) # Bitiş sinyaline bağlan.
         self.training_thread.state_update.connect(self.update_training_visualization) # Durum güncelleme sinyaline bağlan.
+        self.grid_widget.training_active = True # Eğitimde değer/politika katmanı sınırlı sıklıkta yenilenir.
         self.training_thread.start() # Thread'i başlat.
         self.info_panel.set_status("Eğitim devam ediyor...")
         self.statusBar().showMessage(f"Eğitim başladı. Toplam episode: {episodes}")
+    def resume_training(self):
+        # Son checkpoint'teki ajan durumunu yükleyip eğitime kaldığı yerden devam eder.
+        manager = CheckpointManager(self.checkpoint_dir)
+        if not manager.has_checkpoint():
+            manager.close()
+            QMessageBox.warning(self, "Checkpoint Yok", f"'{self.checkpoint_dir}' dizininde checkpoint bulunamadı.")
+            return
+        grid_size = manager.read_training_state()["grid_size"]
+        if grid_size != self.grid_size:
+            self.grid_size_spin.setValue(grid_size) # Ortam ve ajan checkpoint'in grid boyutuyla yeniden oluşturulur.
+        start_episode = manager.restore(self.agent)
+        episodes = self.episodes_spin.value()
+        if start_episode >= episodes:
+            manager.close()
+            self.model_trained = True
+            self.set_game_buttons_enabled(True)
+            QMessageBox.information(self, "Eğitim Tamamlanmış", f"Checkpoint {start_episode} episode içeriyor; devam etmek için episode sayısını artırın.")
+            return
+        self.launch_training(episodes, start_episode=start_episode, checkpoint_manager=manager)
+        self.statusBar().showMessage(f"Eğitime {start_episode}. episode'dan devam ediliyor. Toplam episode: {episodes}")
     def update_training_visualization(self):
         # Eğitim sırasında arayüzü günceller (özellikle canlı modda).
         self.update_ui()
@@ -855,6 +3225,8 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         self.update_ui() # Genel arayüzü güncelle.
     def training_finished(self, rewards, steps):
         # Eğitim bittiğinde çağrılır.
+        self.grid_widget.training_active = False
+        stopped_early = self.training_thread is not None and self.training_thread.stopped_early
         # Buton ve parametrelerin durumunu eski haline getirir.
         self.train_button.setEnabled(True)
         self.stop_button.setEnabled(False)
@@ -865,9 +3237,17 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         avg_reward = sum(rewards[-100:]) / min(100, len(rewards)) if rewards else 0
         avg_steps = sum(steps[-100:]) / min(100, len(steps)) if steps else 0
         result_message = f"Eğitim tamamlandı!\n\nToplam episode: {len(rewards)}\nSon 100 episode ortalama ödül: {avg_reward:.2f}\nSon 100 episode ortalama adım: {avg_steps:.2f}\n\nŞimdi 'AI ile Oyna' butonunu kullanarak eğitilen modeli test edebilirsiniz."
+        if stopped_early: # Yakınsama nedeniyle erken durduysa belirt.
+            result_message += "\n\n✅ Q-tablosu yakınsadığı için eğitim erken durduruldu."
+        if self.training_profiler: # Profil ölçümü açıksa raporu mesaja ekle.
+            result_message += "\n\n⏱️ Profil Raporu:\n" + self.training_profiler.format_report()
+            self.training_profiler = None
         QMessageBox.information(self, "Eğitim Tamamlandı", result_message) # Bilgilendirme mesajı göster.
         self.statusBar().showMessage(f"Eğitim tamamlandı! Son 100 episode ortalama ödül: {avg_reward:.2f}, adım: {avg_steps:.2f}")
         self.training_thread = None; self.model_trained = True # Model eğitildi olarak işaretle.
+        if self.checkpoint_manager: # Son checkpoint run() içinde yazıldı, yazıcıyı kapat.
+            self.checkpoint_manager.close()
+            self.checkpoint_manager = None
         # self.training_status_label = QLabel("Model Durumu: Eğitildi"); self.training_status_label.setStyleSheet("color: green; font-weight: bold;") # Bu satır GUI'de bir yere eklenmeli.
         # Eğitim bitince parametreleri tekrar aktif et
         self.set_params_enabled(True)
@@ -891,8 +3271,28 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         timestamp = "qtable_" + str(self.grid_size) + "_" + str(random.randint(1000,9999)) + ".pkl"
         filename, _ = QFileDialog.getSaveFileName(self, "Q Tablosunu Kaydet", os.path.join(save_dir, timestamp), "Pickle Files (*.pkl);;All Files (*)") # Kayıt dialoğu.
         if filename: # Eğer bir dosya adı seçildiyse
+            removed = self.agent.compact() # Hiç güncellenmemiş sıfır satırlarını kaydetme.
             self.agent.save_q_table(filename) # Ajanın Q-tablosunu kaydet.
-            self.statusBar().showMessage(f"Q tablosu kaydedildi: {filename}")
+            write_model_metadata(filename, self.agent) # Registry'nin tabloyu açmadan okuyacağı metadata.
+            usage = self.agent.memory_usage()
+            self.statusBar().showMessage(f"Q tablosu kaydedildi: {filename} | {usage['n_states']} durum, "
+                                         f"{usage['total_bytes'] / 1024:.0f} KB ({removed} boş satır atıldı)")
+    def load_matching_model(self):
+        # Mevcut grid boyutu ve ortam ayarlarına uygun kayıtlı modeli registry üzerinden yükler.
+        self.model_registry.scan()
+        try:
+            path = self.model_registry.load_into(self.agent)
+        except Exception as e:
+            QMessageBox.critical(self, "Model Yükleme Hatası", f"Model yüklenirken bir hata oluştu: {e}")
+            return
+        if path is None:
+            QMessageBox.warning(self, "Model Yok", f"{self.grid_size}x{self.grid_size} grid için kayıtlı model bulunamadı.")
+            return
+        self.model_loaded = True
+        self.model_trained = True
+        self.ai_button.setEnabled(True)
+        self.save_button.setEnabled(True)
+        self.statusBar().showMessage(f"Model registry'den yüklendi: {path}")
     def load_model(self):
         # Kaydedilmiş bir Q-tablosunu yükler.
         filename, _ = QFileDialog.getOpenFileName(self, "Q Tablosu Yükle", "models" if os.path.exists("models") else ".", "Pickle Files (*.pkl);;All Files (*)") # Yükleme dialoğu.
@@ -924,6 +3324,7 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
             QMessageBox.warning(self, "Model Yok", "AI ile oynamak için önce modeli eğitmeniz veya yüklemeniz gerekiyor.")
             return
         self.env.reset(); self.game_mode = 'ai'; self.info_panel.set_status("AI ile oynanıyor...")
+        self.agent.freeze() # Oynarken bilinmeyen durumlar Q-tablosunu büyütmesin.
         self.info_panel.clear_training_progress()  # AI ile oyna başlarken eğitim bilgisini gizle.
         self.ai_episode_count = 1; self.ai_total_reward = 0 # AI bölüm sayacını ve ödülünü sıfırla.
         self.game_timer.start(self.sim_speed) # Oyun zamanlayıcısını başlat.
@@ -998,6 +3399,7 @@ class DroneDeliverySimulator(QMainWindow): # Ana uygulama penceresi.
         # AI veya manuel oyunu durdurur.
         if self.game_timer.isActive() or self.game_mode == 'human': # Eğer AI oynuyorsa veya manuel moddaysa
             self.game_timer.stop(); self.game_mode = None # Zamanlayıcıyı durdur ve oyun modunu sıfırla.
+            self.agent.unfreeze() # Eğitime devam edilebilmesi için tabloyu tekrar yazılabilir yap.
             self.info_panel.set_status("Oyun durduruldu.")
             self.info_panel.clear_training_progress()  # Oyun durunca eğitim bilgisini gizle.
             self.statusBar().showMessage("Oyun durduruldu.")
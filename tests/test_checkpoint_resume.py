@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+from drone_delivery_system_q_learning import CheckpointManager, DroneDeliveryEnv, QLearningAgent, TrainingThread
+
+EPISODES = 60
+STOP_AT = 25
+
+
+def train(tmp_path, planning_steps, stop_at=None):
+    # Eğitimi (isteğe bağlı olarak stop_at'ta durdurup checkpoint'ten devam ederek) çalıştırır.
+    random.seed(7); np.random.seed(7)
+    env = DroneDeliveryEnv(grid_size=3)
+    agent = QLearningAgent(env, planning_steps=planning_steps)
+    manager = CheckpointManager(str(tmp_path), interval=10, consolidate_every=2, fresh=True)
+    thread = TrainingThread(env, agent, EPISODES, mode="ansi", checkpoint_manager=manager)
+    if stop_at is not None:
+        thread.progress.connect(lambda episode, *_: episode == stop_at and thread.stop())
+    thread.run()
+    manager.close()
+    if stop_at is None:
+        return agent
+    # Farklı RNG durumuyla yeni ortam/ajan: tüm durum checkpoint'ten gelmeli.
+    random.seed(123); np.random.seed(123)
+    env = DroneDeliveryEnv(grid_size=3)
+    agent = QLearningAgent(env, planning_steps=planning_steps)
+    manager = CheckpointManager(str(tmp_path))
+    start_episode = manager.restore(agent)
+    assert start_episode == stop_at
+    TrainingThread(env, agent, EPISODES, mode="ansi", checkpoint_manager=manager, start_episode=start_episode).run()
+    manager.close()
+    return agent
+
+
+@pytest.mark.parametrize("planning_steps", [0, 5])
+def test_resume_matches_uninterrupted_run(tmp_path, planning_steps):
+    uninterrupted = train(tmp_path / "full", planning_steps)
+    resumed = train(tmp_path / "resumed", planning_steps, stop_at=STOP_AT)
+    assert resumed.epsilon == uninterrupted.epsilon
+    assert resumed.step_counter == uninterrupted.step_counter
+    assert resumed.q_table.keys() == uninterrupted.q_table.keys()
+    for state, row in uninterrupted.q_table.items():
+        assert np.array_equal(resumed.q_table[state], row), state
+
+
+def test_fresh_run_ignores_previous_run(tmp_path):
+    # Aynı dizinde yeni bir eğitim, önceki çalışmanın tablosunu devralmamalı.
+    train(tmp_path, 0, stop_at=STOP_AT)
+    random.seed(1); np.random.seed(1)
+    env = DroneDeliveryEnv(grid_size=4)
+    agent = QLearningAgent(env)
+    manager = CheckpointManager(str(tmp_path), interval=5, fresh=True)
+    TrainingThread(env, agent, 10, mode="ansi", checkpoint_manager=manager).run()
+    manager.close()
+    restored = QLearningAgent(DroneDeliveryEnv(grid_size=4))
+    manager = CheckpointManager(str(tmp_path))
+    assert manager.restore(restored) == 10
+    manager.close()
+    assert restored.q_table.keys() == agent.q_table.keys()
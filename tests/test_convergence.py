@@ -0,0 +1,26 @@
+import random
+
+import numpy as np
+
+from drone_delivery_system_q_learning import ConvergenceMonitor, DroneDeliveryEnv, QLearningAgent, TrainingThread
+
+
+def train(monitor):
+    random.seed(3); np.random.seed(3)
+    env = DroneDeliveryEnv(grid_size=3)
+    agent = QLearningAgent(env)
+    TrainingThread(env, agent, 80, mode="ansi", convergence_monitor=monitor).run()
+    return agent
+
+
+def test_monitor_does_not_change_training_trajectory():
+    # Eşikler ulaşılamaz: izleyici sadece ölçer; değerlendirmeler eğitimin RNG akışını değiştirmemeli.
+    monitor = ConvergenceMonitor(window=10, eval_episodes=5, mean_delta_threshold=-1.0)
+    with_monitor = train(monitor)
+    without_monitor = train(None)
+    assert len(monitor.history) == 8
+    assert not monitor.converged
+    assert with_monitor.epsilon == without_monitor.epsilon
+    assert with_monitor.q_table.keys() == without_monitor.q_table.keys()
+    for state, row in without_monitor.q_table.items():
+        assert np.array_equal(with_monitor.q_table[state], row), state
@@ -0,0 +1,67 @@
+from drone_delivery_system_q_learning import DifferentialFuzzer, DroneDeliveryEnv, QLearningAgent
+
+
+class SecondLandingEnv(DroneDeliveryEnv):
+    # Yerleştirilmiş hata: ikinci inişte ödül bir fazla.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.landings = 0
+
+    def step(self, action):
+        was_flying = self.is_flying
+        state, reward, done, info = super().step(action)
+        if action == 5 and was_flying:
+            self.landings += 1
+            if self.landings == 2:
+                reward += 1
+        return state, reward, done, info
+
+
+class SecondPickupAgent(QLearningAgent):
+    # Yerleştirilmiş hata: ikinci kargo eylemi (4) öğreniminde Q değeri hafifçe kayar.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pickups = 0
+
+    def learn(self, state, action, reward, next_state, done):
+        super().learn(state, action, reward, next_state, done)
+        if action == 4:
+            self.pickups += 1
+            if self.pickups == 2:
+                self.q_table[state][action] += 1e-9
+
+
+def test_identical_implementations_do_not_diverge():
+    fuzzer = DifferentialFuzzer(lambda grid_size: DroneDeliveryEnv(grid_size=grid_size),
+                                candidate_agent_factory=QLearningAgent, reference_agent_factory=QLearningAgent,
+                                grid_sizes=(3, 4), seed=1)
+    assert fuzzer.run(total_steps=2000)["divergence"] is None
+
+
+def test_env_divergence_is_detected_and_shrunk():
+    fuzzer = DifferentialFuzzer(lambda grid_size: SecondLandingEnv(grid_size=grid_size), grid_sizes=(4,), seed=3)
+    divergence = fuzzer.run(total_steps=20000)["divergence"]
+    assert divergence is not None and divergence["kind"] == "env"
+    # En kısa tekrar: kalk, in, kalk, in.
+    assert divergence["actions"] == [5, 5, 5, 5]
+    assert fuzzer._replay(4, divergence["reset_seed"], divergence["actions"]) == 3
+
+
+def test_agent_divergence_is_detected_and_shrunk():
+    fuzzer = DifferentialFuzzer(lambda grid_size: DroneDeliveryEnv(grid_size=grid_size),
+                                candidate_agent_factory=SecondPickupAgent, reference_agent_factory=QLearningAgent,
+                                grid_sizes=(4,), seed=5)
+    divergence = fuzzer.run(total_steps=20000)["divergence"]
+    assert divergence is not None and divergence["kind"] == "agent"
+    assert divergence["step"] > 2
+    assert divergence["actions"] == [4, 4]
+    assert len(divergence["learn_seeds"]) == 2
+    steps = list(zip(divergence["actions"], divergence["learn_seeds"]))
+    assert fuzzer._replay_agents(4, divergence["reset_seed"], steps) == 1
+
+
+def test_ddmin_removes_pairs_that_single_deletions_cannot():
+    # Farklılık: 7 var ve toplam 7. Tek bir ±1 silinemez, yalnızca birbirini götüren çiftler silinebilir.
+    def reproduce(trial):
+        return trial if 7 in trial and sum(trial) == 7 else None
+    assert DifferentialFuzzer._ddmin([1, 2, -1, 7, 3, -2, -3, 1, -1], reproduce) == [7]
@@ -0,0 +1,47 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from drone_delivery_system_q_learning import DroneDeliveryEnv, GridWidget, QLearningAgent
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def make_widget(app):
+    env = DroneDeliveryEnv(grid_size=4)
+    agent = QLearningAgent(env)
+    widget = GridWidget(env, agent=agent)
+    widget.show_overlay = True
+    widget.overlay_interval = 60.0 # Test süresince throttle penceresi kapanmasın.
+    return env, agent, widget
+
+
+def test_context_change_is_throttled_during_training(app):
+    env, agent, widget = make_widget(app)
+    widget.training_active = True
+    first = widget.overlay_pixmap()
+    env.battery -= 30 # Batarya kovası (bağlam) değişir.
+    agent.step_counter += 1 # Tablo da değişmiş sayılır.
+    assert widget.overlay_pixmap() is first
+
+
+def test_context_change_rebuilds_immediately_outside_training(app):
+    env, agent, widget = make_widget(app)
+    first = widget.overlay_pixmap()
+    assert widget.overlay_pixmap() is first
+    env.battery -= 30
+    assert widget.overlay_pixmap() is not first
+
+
+def test_grid_size_change_always_rebuilds(app):
+    env, agent, widget = make_widget(app)
+    widget.training_active = True
+    first = widget.overlay_pixmap()
+    widget.env = DroneDeliveryEnv(grid_size=5)
+    assert widget.overlay_pixmap() is not first
@@ -0,0 +1,64 @@
+import random
+import threading
+
+import numpy as np
+
+from drone_delivery_system_q_learning import (DroneDeliveryEnv, ParameterServer, ParameterServerClient,
+                                              ParameterServerWorker, QLearningAgent, evaluate_greedy_policy,
+                                              train_worker)
+
+GRID_SIZE = 3
+EPISODES = 400
+STATE = (0, 0, 0, 0, 0, 0, 4, 0)
+
+
+def test_push_deltas_are_scaled_by_worker_count():
+    server = ParameterServer(n_workers=2).start()
+    host, port = server.address
+    clients = [ParameterServerClient(host, port) for _ in range(2)]
+    try:
+        # İki işçi aynı durumu yeni keşfetmiş: ilk değer yazılır, ikincisi ortalanır.
+        clients[0].push([STATE], [1], [4.0], [True])
+        clients[1].push([STATE], [1], [2.0], [True])
+        assert server.q_table[STATE][1] == 3.0
+        # Aynı eski kopyaya göre hesaplanmış iki delta toplanmaz, ortalanır.
+        clients[0].push([STATE], [1], [1.0])
+        clients[1].push([STATE], [1], [1.0])
+        assert server.q_table[STATE][1] == 4.0
+    finally:
+        for client in clients:
+            client.close()
+        server.shutdown()
+
+
+def train_master(n_workers, seed=0):
+    # n_workers işçiyi localhost sunucusuna bağlayıp eğitir; ana tablonun (en büyük değer, greedy başarı) çiftini döndürür.
+    random.seed(seed); np.random.seed(seed)
+    server = ParameterServer().start()
+    host, port = server.address
+
+    def work():
+        env = DroneDeliveryEnv(grid_size=GRID_SIZE)
+        agent = QLearningAgent(env)
+        worker = ParameterServerWorker(agent, host, port, max_staleness=4)
+        train_worker(env, agent, worker, EPISODES, sync_interval=10)
+        worker.close()
+
+    threads = [threading.Thread(target=work) for _ in range(n_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+    agent = QLearningAgent(DroneDeliveryEnv(grid_size=GRID_SIZE))
+    agent.set_q_table({state: row.copy() for state, row in server.q_table.items()})
+    random.seed(99); np.random.seed(99)
+    success = evaluate_greedy_policy(DroneDeliveryEnv(grid_size=GRID_SIZE), agent, 200)["success_rate"]
+    return max(row.max() for row in server.q_table.values()), success
+
+
+def test_multi_worker_master_stays_bounded():
+    single_max, single_success = train_master(1)
+    multi_max, multi_success = train_master(3)
+    assert multi_max <= 1.25 * single_max # Eski birleştirme kuralında ~3-6 katına çıkıyordu.
+    assert multi_success >= single_success - 0.1
@@ -0,0 +1,37 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from drone_delivery_system_q_learning import DroneDeliveryEnv, QLearningAgent, evaluate_greedy_policy
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def load_agent(name, dtype=np.float64):
+    agent = QLearningAgent(DroneDeliveryEnv(grid_size=5))
+    agent.load_q_table(os.path.join(MODELS_DIR, name), dtype=dtype)
+    return agent
+
+
+@pytest.mark.parametrize("name", ["qtable_5_1865.pkl", "qtable_5_2885.pkl"])
+def test_float32_keeps_greedy_actions(name):
+    # float64 tablosunun greedy eylemi, float32 tablosunun en iyi eylemleri arasında olmalı.
+    agent = load_agent(name)
+    reference = {state: row.copy() for state, row in agent.q_table.items()}
+    agent.set_dtype(np.float32)
+    for state, row in agent.q_table.items():
+        assert row.dtype == np.float32
+        best = np.flatnonzero(row == row.max())
+        assert np.argmax(reference[state]) in best, state
+
+
+def test_float32_greedy_evaluation_parity():
+    # Aynı tohumla float64 ve float32 greedy değerlendirmeleri aynı sonucu vermeli.
+    results = []
+    for dtype in (np.float64, np.float32):
+        agent = load_agent("qtable_5_2885.pkl", dtype=dtype)
+        random.seed(0); np.random.seed(0)
+        results.append(evaluate_greedy_policy(DroneDeliveryEnv(grid_size=5), agent, episodes=200))
+    assert results[0] == results[1]
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+
+from drone_delivery_system_q_learning import DroneDeliveryEnv, QLearningAgent, q_table_memory_usage
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def load_agent(name):
+    agent = QLearningAgent(DroneDeliveryEnv(grid_size=5))
+    agent.load_q_table(os.path.join(MODELS_DIR, name))
+    return agent
+
+
+def test_memory_usage_hashed_int_keys():
+    # Eski model: anahtarlar hashlenmiş int.
+    agent = load_agent("qtable_5_1865.pkl")
+    usage = agent.memory_usage()
+    assert usage["n_states"] == len(agent.q_table)
+    assert usage["key_bytes"] > 0
+
+
+def test_memory_usage_counts_row_data_of_view_rows():
+    # Tek bir bloktan bölünen (owndata=False) satırların veri boyutu da sayılmalı.
+    block = np.ones((50, 6))
+    usage = q_table_memory_usage({(i, 0): row for i, row in enumerate(block)})
+    header_bytes = sys.getsizeof(np.empty(0)) # Verisiz ndarray başlığı.
+    assert not block[0].flags.owndata
+    assert usage["row_bytes"] >= block.nbytes + header_bytes * len(block)
+
+
+def test_compact_drops_only_zero_rows():
+    agent = load_agent("qtable_5_2885.pkl")
+    before = {state: row.copy() for state, row in agent.q_table.items()}
+    removed = agent.compact()
+    assert removed == sum(1 for row in before.values() if not row.any())
+    assert all(np.array_equal(before[state], row) for state, row in agent.q_table.items())
+    assert agent.memory_usage()["zero_rows"] == 0
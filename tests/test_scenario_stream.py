@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from drone_delivery_system_q_learning import DroneDeliveryEnv, ScenarioStream, iter_scenario_log, write_scenario_log
+
+GRID_SIZE = 5
+
+
+def make_scenarios(n, seed=0):
+    rng = np.random.RandomState(seed)
+    scenarios = []
+    for _ in range(n):
+        cells = rng.choice(GRID_SIZE * GRID_SIZE, size=5, replace=False)
+        points = [(int(c) // GRID_SIZE, int(c) % GRID_SIZE) for c in cells]
+        scenarios.append({
+            "depot": points[0],
+            "start": points[1],
+            "battery": int(rng.randint(50, 101)),
+            "delivery_points": points[2:2 + int(rng.randint(1, 4))],
+        })
+    return scenarios
+
+
+def env_scenario(env):
+    return {
+        "depot": tuple(env.cargo_depot_pos.tolist()),
+        "start": tuple(env.drone_pos.tolist()),
+        "battery": env.battery,
+        "delivery_points": [tuple(point.tolist()) for point in env.delivery_points],
+    }
+
+
+@pytest.mark.parametrize("extension", ["bin", "csv"])
+def test_round_trip_through_reset(tmp_path, extension):
+    scenarios = make_scenarios(25)
+    path = str(tmp_path / f"orders.{extension}")
+    assert write_scenario_log(path, iter(scenarios), chunk_size=4) == len(scenarios)
+    assert [s for chunk in iter_scenario_log(path, chunk_size=7) for s in chunk] == scenarios
+    stream = ScenarioStream(path, chunk_size=3, prefetch_chunks=2, loop=False)
+    try:
+        env = DroneDeliveryEnv(grid_size=GRID_SIZE, scenario_source=stream) # Kurucu ilk senaryoyu uygular.
+        assert env_scenario(env) == scenarios[0]
+        for expected in scenarios[1:]:
+            env.reset()
+            assert env_scenario(env) == expected
+            assert len(env.delivered) == len(expected["delivery_points"])
+        with pytest.raises(StopIteration):
+            env.reset()
+    finally:
+        stream.close()
+
+
+def test_loop_restarts_from_first_scenario(tmp_path):
+    scenarios = make_scenarios(4, seed=1)
+    path = str(tmp_path / "orders.bin")
+    write_scenario_log(path, scenarios)
+    stream = ScenarioStream(path, chunk_size=3, loop=True)
+    try:
+        seen = [stream.next_scenario() for _ in range(2 * len(scenarios))]
+    finally:
+        stream.close()
+    assert seen == scenarios + scenarios
@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+
+from drone_delivery_system_q_learning import AsyncVectorEnv, DroneDeliveryEnv
+
+NUM_ENVS = 3
+SEED = 11
+MAX_STEPS = 12 # Kısa episode'lar: hem max_steps hem batarya/teslimat sonlanmaları görülür.
+
+
+def reference_envs():
+    # Alt süreçlerle aynı tohumlarla kurulmuş süreç içi ortamlar.
+    envs = []
+    for index in range(NUM_ENVS):
+        random.seed(SEED + index); np.random.seed(SEED + index)
+        envs.append((DroneDeliveryEnv(grid_size=4, max_steps=MAX_STEPS), random.getstate(), np.random.get_state()))
+    return envs
+
+
+def test_vector_env_matches_single_envs_with_auto_reset():
+    action_rng = random.Random(0)
+    references = reference_envs()
+    states_ref = []
+    rng_states = []
+    for env, python_state, numpy_state in references:
+        random.setstate(python_state); np.random.set_state(numpy_state)
+        states_ref.append(env.reset())
+        rng_states.append((random.getstate(), np.random.get_state()))
+    terminals_seen = 0
+    with AsyncVectorEnv(NUM_ENVS, grid_size=4, max_steps=MAX_STEPS, seed=SEED) as vec_env:
+        states = vec_env.reset()
+        assert states == [tuple(state) for state in states_ref]
+        for _ in range(100):
+            actions = [action_rng.randrange(6) for _ in range(NUM_ENVS)]
+            states, rewards, dones, terminal_states = vec_env.step(actions)
+            for i, (env, _, _) in enumerate(references):
+                random.setstate(rng_states[i][0]); np.random.set_state(rng_states[i][1])
+                state, reward, done, _ = env.step(actions[i])
+                assert rewards[i] == reward
+                assert bool(dones[i]) == done
+                if done: # Terminal durum ayrı döner, durum yeni episode'un başlangıcıdır.
+                    assert terminal_states[i] == tuple(state)
+                    state = env.reset()
+                    terminals_seen += 1
+                else:
+                    assert terminal_states[i] is None
+                assert states[i] == tuple(state)
+                rng_states[i] = (random.getstate(), np.random.get_state())
+    assert terminals_seen >= NUM_ENVS
+
+
+def test_close_is_idempotent():
+    vec_env = AsyncVectorEnv(2, grid_size=3, seed=0)
+    vec_env.reset()
+    vec_env.close()
+    vec_env.close()
+    assert all(not process.is_alive() for process in vec_env.processes)